@@ -1,11 +1,59 @@
 import streamlit as st
+import streamlit.components.v1 as components
 import pandas as pd
-import time
-import re
+import numpy as np
 from io import BytesIO
-import urllib.parse
-import base64
-import random
+from pathlib import Path
+import os
+import uuid
+
+from autowhatsend import (
+    DEDUPE_OPTIONS,
+    DEFAULT_COUNTRY,
+    DEFAULT_JOURNAL_PATH,
+    DEFAULT_PACING,
+    JOB_WORKERS,
+    NUMBERING_PLANS,
+    PACING_MODES,
+    PARALLEL_CHUNK_ROWS,
+    REPORT_CHUNK_ROWS,
+    REPORT_FORMATS,
+    Campaign,
+    ColumnTexts,
+    JobRunner,
+    ResultCache,
+    SendJournal,
+    StageRecorder,
+    STATIC_DIR,
+    SuppressionStore,
+    build_pacing,
+    campaign_storage_id,
+    compile_message_template,
+    create_process_pool,
+    describe_pacing,
+    export_html_path,
+    export_report_path,
+    export_shard_bundle_path,
+    find_duplicates,
+    hash_file_bytes,
+    iter_records_parallel,
+    iter_report_chunks,
+    iter_with_progress,
+    phones_as_int,
+    read_contacts,
+    render_message,
+    seconds_per_message,
+    shard_bounds,
+    shard_manifest,
+    sorted_membership,
+    stage_memory_bytes,
+    SUPPORTED_EXTENSIONS,
+    URL_LENGTH_BUDGET,
+    URL_OVERFLOW_ACTIONS,
+    url_length_summary,
+    validate_phone_numbers,
+    validate_phone_numbers_parallel,
+)
 
 # Configuración de la página
 st.set_page_config(
@@ -25,256 +73,279 @@ if 'message_ready' not in st.session_state:
     st.session_state.message_ready = False
 if 'sending_complete' not in st.session_state:
     st.session_state.sending_complete = False
-if 'failed_numbers' not in st.session_state:
-    st.session_state.failed_numbers = []
-if 'successful_numbers' not in st.session_state:
-    st.session_state.successful_numbers = []
-if 'current_sending_index' not in st.session_state:
-    st.session_state.current_sending_index = 0
+if 'journal_ack' not in st.session_state:
+    st.session_state.journal_ack = 0
 if 'sending_in_progress' not in st.session_state:
     st.session_state.sending_in_progress = False
-if 'whatsapp_urls' not in st.session_state:
-    st.session_state.whatsapp_urls = []
+if 'campaign' not in st.session_state:
+    st.session_state.campaign = None
+if 'session_tag' not in st.session_state:
+    st.session_state.session_tag = uuid.uuid4().hex[:8]
+if 'cancelled_jobs' not in st.session_state:
+    st.session_state.cancelled_jobs = set()
 
-def validate_colombian_number(number):
-    """Valida que el número sea un número colombiano válido"""
-    number_str = str(number).strip()
-    clean_number = re.sub(r'[^\d]', '', number_str)
-    
-    if len(clean_number) == 10 and clean_number.startswith('3'):
-        return True, clean_number
-    return False, clean_number
-
-def format_number_for_url(number):
-    """Formatea el número para URLs de WhatsApp"""
-    return f"57{number}"
-
-def generate_whatsapp_url(number, message):
-    """Genera URL de WhatsApp Web"""
-    encoded_message = urllib.parse.quote(message)
-    return f"https://web.whatsapp.com/send?phone={number}&text={encoded_message}"
-
-def create_excel_download(data, filename):
-    """Crea un archivo Excel para descarga"""
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        data.to_excel(writer, index=False, sheet_name='Datos')
-    return output.getvalue()
-
-def create_html_with_auto_click(urls_data):
-    """Crea HTML con auto-click para enviar mensajes"""
-    html_content = """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>AutoWhatsApp - Envío Automático</title>
-        <style>
-            body { 
-                font-family: Arial, sans-serif; 
-                margin: 40px; 
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-            }
-            .container {
-                max-width: 800px;
-                margin: 0 auto;
-                background: rgba(255, 255, 255, 0.1);
-                padding: 30px;
-                border-radius: 15px;
-                backdrop-filter: blur(10px);
-            }
-            .whatsapp-link { 
-                display: inline-block; 
-                background-color: #25D366; 
-                color: white; 
-                padding: 15px 25px; 
-                margin: 15px; 
-                text-decoration: none; 
-                border-radius: 30px; 
-                font-weight: bold; 
-                font-size: 16px;
-                transition: all 0.3s; 
-                box-shadow: 0 4px 15px rgba(37, 211, 102, 0.3);
-            }
-            .whatsapp-link:hover { 
-                background-color: #128C7E; 
-                transform: translateY(-2px);
-                box-shadow: 0 6px 20px rgba(37, 211, 102, 0.4);
-            }
-            .contact-info { 
-                background: rgba(255, 255, 255, 0.15); 
-                padding: 20px; 
-                margin: 20px 0; 
-                border-radius: 12px; 
-                border-left: 5px solid #25D366; 
-            }
-            .instructions {
-                background: rgba(255, 255, 255, 0.1);
-                padding: 20px;
-                border-radius: 10px;
-                margin: 20px 0;
-            }
-            .timer {
-                font-size: 18px;
-                font-weight: bold;
-                color: #25D366;
-                margin: 10px 0;
-            }
-            h1 {
-                text-align: center;
-                font-size: 2.5em;
-                margin-bottom: 30px;
-                text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-            }
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <h1>📱 AutoWhatsApp</h1>
-            
-            <div class="instructions">
-                <h3>🚀 Instrucciones para Envío Automático:</h3>
-                <ol>
-                    <li>Haz clic en el botón "Iniciar Envío Automático"</li>
-                    <li>Se abrirá WhatsApp Web en nueva pestaña cada 15 segundos</li>
-                    <li>El mensaje estará pre-escrito</li>
-                    <li>Solo debes hacer clic en <strong>ENVIAR</strong> manualmente</li>
-                    <li>El timer mostrará el progreso</li>
-                </ol>
-                <p><strong>💡 Tip:</strong> Mantén WhatsApp Web abierto y logueado</p>
-            </div>
-            
-            <div id="progress" style="text-align: center; margin: 30px 0;">
-                <h3>Progreso: <span id="current">0</span> / <span id="total">""" + str(len(urls_data)) + """</span></h3>
-                <div class="timer">Próximo envío en: <span id="timer">15</span> segundos</div>
-            </div>
-            
-            <div style="text-align: center;">
-                <button onclick="startSending()" style="background:#25D366; color:white; border:none; padding:15px 30px; border-radius:25px; font-size:18px; font-weight:bold; cursor:pointer;">
-                    🚀 Iniciar Envío Automático
-                </button>
-            </div>
-    """
-    
-    for i, data in enumerate(urls_data):
-        html_content += f"""
-            <div class="contact-info" id="contact-{i+1}" style="display: none;">
-                <strong>👤 Contacto {i+1}:</strong> {data['display_info']}<br>
-                <strong>💬 Mensaje:</strong> {data['mensaje'][:100]}...<br><br>
-                <a href="{data['url']}" target="_blank" class="whatsapp-link">
-                    📱 Enviar a {data['display_info'].split(' - ')[0] if ' - ' in data['display_info'] else data['display_info']}
-                </a>
-            </div>
-        """
-    
-    html_content += """
-        </div>
-        
-        <script>
-            const totalContacts = """ + str(len(urls_data)) + """;
-            let currentContact = 0;
-            let timerInterval;
-            
-            function startSending() {
-                if (currentContact < totalContacts) {
-                    sendNext();
-                }
-            }
-            
-            function sendNext() {
-                if (currentContact > 0) {
-                    // Ocultar contacto anterior
-                    document.getElementById('contact-' + currentContact).style.display = 'none';
-                }
-                
-                currentContact++;
-                document.getElementById('current').textContent = currentContact;
-                
-                // Mostrar contacto actual
-                const currentElement = document.getElementById('contact-' + currentContact);
-                if (currentElement) {
-                    currentElement.style.display = 'block';
-                    
-                    // Abrir enlace automáticamente
-                    const link = currentElement.querySelector('.whatsapp-link');
-                    if (link) {
-                        window.open(link.href, '_blank');
-                    }
-                }
-                
-                // Iniciar timer para próximo envío
-                if (currentContact < totalContacts) {
-                    let seconds = 15;
-                    updateTimer(seconds);
-                    
-                    timerInterval = setInterval(function() {
-                        seconds--;
-                        updateTimer(seconds);
-                        
-                        if (seconds <= 0) {
-                            clearInterval(timerInterval);
-                            sendNext();
-                        }
-                    }, 1000);
-                }
-            }
-            
-            function updateTimer(seconds) {
-                document.getElementById('timer').textContent = seconds;
-            }
-        </script>
-    </body>
-    </html>
+# Caché compartida entre sesiones, indexada por el hash del archivo subido.
+# Cada etapa guarda como máximo CACHE_MAX_ENTRIES resultados y descarta el menos usado.
+CACHE_MAX_ENTRIES = int(os.environ.get('AUTOWHATSEND_CACHE_MAX_ENTRIES', '16'))
+
+# Instrumentación: tiempo, filas y memoria de cada etapa, en el panel lateral y en un log JSON por líneas.
+# AUTOWHATSEND_TRACE_MEMORY=1 activa tracemalloc (más preciso, pero varias veces más lento).
+STAGE_LOG_PATH = os.environ.get('AUTOWHATSEND_STAGE_LOG', 'autowhatsend_stages.jsonl')
+PROFILE_DIR = os.environ.get('AUTOWHATSEND_PROFILE_DIR', 'autowhatsend_profiles')
+TRACE_MEMORY = os.environ.get('AUTOWHATSEND_TRACE_MEMORY', '0') == '1'
+
+@st.cache_resource
+def get_stage_recorder():
+    return StageRecorder(STAGE_LOG_PATH or None, trace_memory=TRACE_MEMORY, profile_dir=PROFILE_DIR)
+
+# Preparación en paralelo (validación y exportación) para listas grandes.
+# Con AUTOWHATSEND_WORKERS menor que 2 todo corre en el hilo de la sesión.
+PARALLEL_WORKERS = int(os.environ.get('AUTOWHATSEND_WORKERS', '0'))
+PARALLEL_ROWS = int(os.environ.get('AUTOWHATSEND_CHUNK_ROWS', str(PARALLEL_CHUNK_ROWS)))
+
+@st.cache_resource
+def get_process_pool():
+    return create_process_pool(PARALLEL_WORKERS) if PARALLEL_WORKERS > 1 else None
+
+@st.cache_resource
+def get_contact_tables():
+    """Archivos ya leídos por contenido y nombre (compartidos por todas las sesiones)"""
+    return ResultCache(CACHE_MAX_ENTRIES)
+
+def cached_read_contacts(file_hash, file_name, file_bytes, progress=None, context=None):
+    """Lee el archivo una sola vez por contenido; progress (fuera de la caché) recibe las filas leídas"""
+    tables = get_contact_tables()
+    df = tables.get((file_hash, file_name))
+    if df is None:
+        with get_stage_recorder().stage('read_contacts', context=context) as stage:
+            df = read_contacts(BytesIO(file_bytes), file_name, progress=progress)
+            stage['rows'] = len(df)
+        tables.put((file_hash, file_name), df)
+    return df
+
+@st.cache_resource(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def cached_column_texts(file_hash, _df):
+    """Texto de cada columna (y codificado para URL) compartido por todas las plantillas y campañas del archivo"""
+    return ColumnTexts(_df)
+
+@st.cache_resource
+def get_validation_results():
+    """Validaciones terminadas por archivo, columna y país: volver a una columna ya validada es inmediato"""
+    return ResultCache(CACHE_MAX_ENTRIES)
+
+@st.cache_resource(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def cached_duplicates(file_hash, number_column, default_country, keep, _validation, _context=None):
+    """Marca los números repetidos una sola vez por validación y criterio"""
+    with get_stage_recorder().stage('dedupe', rows=len(_validation), context=_context):
+        return find_duplicates(_validation, keep).to_numpy()
+
+@st.cache_resource(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def cached_phones(file_hash, number_column, default_country, _validation):
+    """Números como int64 para buscarlos en las listas de supresión"""
+    return phones_as_int(_validation)
+
+# Trabajos en segundo plano (validación y HTML), compartidos por todas las sesiones.
+# Sus resultados reemplazan la caché: de cada tipo se conservan CACHE_MAX_ENTRIES trabajos
+# terminados, además de los que alguna sesión todavía muestra (sus archivos no se borran).
+JOB_RUNNER_WORKERS = int(os.environ.get('AUTOWHATSEND_JOB_WORKERS', str(JOB_WORKERS)))
+JOB_POLL_SECONDS = 0.5
+
+@st.cache_resource
+def get_job_runner():
+    return JobRunner(max_workers=JOB_RUNNER_WORKERS, max_finished=CACHE_MAX_ENTRIES)
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def job_progress(job_id, label):
+    """Barra de avance que consulta el trabajo; cuando termina vuelve a ejecutar la app"""
+    job = get_job_runner().get(job_id)
+    if job is None or job.finished:
+        st.rerun()
+    progress_text = f"⏳ {label}: {job.done:,} de {job.total:,}" if job.total else f"⏳ {label}..."
+    st.progress(job.fraction, text=progress_text)
+    if st.button("⏹️ Cancelar", key=f"cancel_{job_id}"):
+        # Solo esta sesión lo deja: si otra pidió lo mismo, el trabajo sigue para ella
+        get_job_runner().cancel(job_id, owner=st.session_state.session_tag)
+        st.session_state.cancelled_jobs.add(job_id)
+        st.rerun()
+
+def background_result(session_key, job_key, label, function, *args, cleanup=None, cache=None):
+    """Resultado del trabajo de esta sesión (None mientras corre, con su barra de avance).
+
+    Inicia el trabajo si no existe o si cambió job_key; el ID queda en session_state.
+    La sesión es dueña del trabajo (no se descarta ni se borra su archivo) hasta
+    que pide otro del mismo tipo (session_key).
+    Con cache (ResultCache), un resultado ya calculado para job_key se devuelve sin trabajo.
     """
-    
-    return html_content
+    if cache is not None and job_key in cache:
+        return cache.get(job_key)
+    runner = get_job_runner()
+    owner = st.session_state.session_tag
+    submit = lambda: runner.submit(function, *args, key=job_key, cleanup=cleanup, kind=session_key, owner=owner)
+    job = runner.get(st.session_state.get(session_key))
+    if job is None or job.key != job_key:
+        if job is not None:
+            runner.release(job.id, owner)
+            st.session_state.cancelled_jobs.discard(job.id)
+        st.session_state[session_key] = submit()
+        job = runner.get(st.session_state[session_key])
+    cancelled = job.state == 'cancelled' or job.id in st.session_state.cancelled_jobs
+    if job.state == 'done' and not cancelled:
+        if cache is not None:
+            cache.put(job_key, job.result)
+        return job.result
+    if not job.finished and not cancelled:
+        job_progress(job.id, label)
+        return None
+    if cancelled:
+        st.warning(f"⏹️ {label}: cancelado")
+    else:
+        st.error(f"❌ {label}: {job.error}")
+    if st.button("🔄 Reintentar", key=f"retry_{session_key}"):
+        runner.release(job.id, owner)
+        st.session_state.cancelled_jobs.discard(job.id)
+        st.session_state[session_key] = submit()
+        st.rerun()
+    return None
 
-def create_javascript_opener(urls, delay=15):
-    """Crea código JavaScript para abrir URLs con delay de 15 segundos"""
-    js_code = """
-    <script>
-        function openWhatsAppLinks() {
+def background_file(session_key, job_key, label, function, *args, cleanup=None, path_of=None):
+    """Como background_result, para trabajos que escriben un archivo: (resultado, data) o None mientras corre.
+
+    data es para download_button y lee el archivo al hacer clic. Si el trabajo
+    ya se descartó y su archivo no existe, lo vuelve a generar y espera el resultado.
     """
-    
-    for i, url in enumerate(urls):
-        js_code += f"""
-            setTimeout(function() {{
-                window.open('{url}', '_blank');
-                console.log('Abriendo enlace {i+1} después de {i * delay} segundos');
-            }}, {i * (delay * 1000)});
-        """
-    
-    js_code += """
-        }
-        
-        // Iniciar el proceso automáticamente
-        setTimeout(function() {
-            openWhatsAppLinks();
-            alert('🚀 Iniciando envío automático. Se abrirá una pestaña cada 15 segundos.');
-        }, 2000);
-    </script>
+    result = background_result(session_key, job_key, label, function, *args, cleanup=cleanup)
+    if result is None:
+        return None
+    path_of = path_of or (lambda result: result)
+    # data corre fuera del hilo de la sesión: no puede usar st.session_state
+    runner, owner = get_job_runner(), st.session_state.session_tag
+
+    def data():
+        try:
+            return Path(path_of(result)).read_bytes()
+        except FileNotFoundError:
+            job = runner.wait(runner.submit(function, *args, key=job_key, cleanup=cleanup, kind=session_key,
+                                            owner=owner))
+            if job.state != 'done':
+                raise RuntimeError(f"{label}: {job.error or 'cancelado'}")
+            return Path(path_of(job.result)).read_bytes()
+    return result, data
+
+def validate_numbers(numbers, default_country, executor, recorder, context=None, progress=None):
+    """Valida la columna de números (trabajo en segundo plano del paso 3)"""
+    with recorder.stage('validate', rows=len(numbers), context=context):
+        return validate_phone_numbers_parallel(numbers, default_country, executor, PARALLEL_ROWS, progress)
+
+def prepare_html_export(campaign, pacing, campaign_id, executor, recorder, context=None, progress=None):
+    """Genera el HTML de la campaña en un archivo temporal, informando el avance por contacto"""
+    with recorder.stage('html_export', rows=len(campaign), context=context):
+        records = iter_records_parallel(campaign, executor, PARALLEL_ROWS, PARALLEL_WORKERS)
+        return export_html_path(campaign, pacing, campaign_id, iter_with_progress(records, len(campaign), progress))
+
+def prepare_shard_bundle(campaign, weights, pacing, campaign_id, names, executor, recorder, context=None,
+                         progress=None):
+    """Genera el ZIP con un HTML y una lista de URLs por operador, más el manifiesto"""
+    with recorder.stage('shard_export', rows=len(campaign), context=context):
+        return export_shard_bundle_path(
+            campaign, weights, pacing, campaign_id, names,
+            records=lambda part: iter_records_parallel(part, executor, PARALLEL_ROWS, PARALLEL_WORKERS),
+            progress=progress
+        )
+
+def prepare_report(df, number_column, validation, campaign, duplicates, suppressed, oversized, journal, campaign_id,
+                   fmt, recorder, context=None, progress=None):
+    """Escribe el reporte por bloques en un archivo temporal (Excel, CSV o Parquet) y devuelve su ruta"""
+    with recorder.stage('report', rows=len(df), context=context):
+        chunks = iter_report_chunks(df, number_column, validation, campaign, duplicates, suppressed,
+                                    journal.contact_states(campaign_id), oversized=oversized)
+        total_chunks = -(-len(df) // REPORT_CHUNK_ROWS)
+        return export_report_path(iter_with_progress(chunks, total_chunks, progress, every=1), fmt)
+
+# Máximo de operadores al repartir una campaña en lotes
+MAX_OPERATORS = 20
+
+# Diario de envíos y listas de supresión, compartidos por todas las sesiones del servidor
+JOURNAL_PATH = os.environ.get('AUTOWHATSEND_JOURNAL_PATH', DEFAULT_JOURNAL_PATH)
+
+# Opción de supresión que no es una lista guardada: números ya abiertos o confirmados en el diario
+CONTACTED_LIST = '__contactados__'
+
+@st.cache_resource
+def get_send_journal():
+    return SendJournal(JOURNAL_PATH)
+
+@st.cache_resource
+def get_suppression_store():
+    return SuppressionStore(JOURNAL_PATH)
+
+# Panel de envío como componente: devuelve a la app los eventos de cada contacto.
+# Solo recibe una ventana de SEND_PANEL_PAGE_ROWS contactos por vez.
+SEND_PANEL_PAGE_ROWS = 200
+send_panel = components.declare_component('send_panel', path=str(STATIC_DIR))
+
+# Tablas grandes (números válidos o inválidos): el navegador recibe una página por vez
+TABLE_PAGE_ROWS = 100
+
+def paginated_table(positions, build_page, key):
+    """Muestra por páginas las filas en positions; build_page(posiciones) arma el DataFrame de una página"""
+    pages = max(-(-len(positions) // TABLE_PAGE_ROWS), 1)
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        page = int(st.number_input("Página", min_value=1, max_value=pages, value=1, step=1, key=f"{key}_{pages}"))
+    with col2:
+        st.caption(f"{len(positions):,} filas · página {page} de {pages}")
+    start = (page - 1) * TABLE_PAGE_ROWS
+    st.dataframe(build_page(positions[start:start + TABLE_PAGE_ROWS]), hide_index=True)
+
+def url_length_stats(contacts_campaign, message_template, budget):
+    """Campaña con la plantilla, largo de sus URLs, resumen con budget e histograma, guardados en la sesión.
+
+    Se recalculan solo si cambian los contactos, la plantilla o el límite: las demás
+    ejecuciones de la app, como cada evento del panel de envío, no recorren la campaña.
     """
-    
-    return js_code
+    stats = st.session_state.get('url_length_stats')
+    if stats is None or stats['contacts'] is not contacts_campaign or stats['template'] != message_template:
+        campaign = contacts_campaign.with_template(message_template)
+        with get_stage_recorder().stage('url_lengths', rows=len(campaign), context=st.session_state.session_tag):
+            lengths = campaign.url_lengths()
+        histogram = None
+        if len(lengths):
+            histogram = np.histogram(lengths, bins=min(20, max(1, int(lengths.max() - lengths.min()))))
+        stats = {'contacts': contacts_campaign, 'template': message_template, 'campaign': campaign,
+                 'lengths': lengths, 'histogram': histogram, 'budget': None}
+    if stats['budget'] != budget:
+        stats.update(budget=budget, summary=url_length_summary(stats['lengths'], budget),
+                     over=stats['lengths'] > budget, untruncatable=None)
+    st.session_state.url_length_stats = stats
+    return stats
 
 # Título principal
 st.title("📱 AutoWhatSend Gratis")
-st.markdown("🚀 **Envío Semi-Automático 100% Gratuito** - 15 segundos entre mensajes")
+st.markdown(f"🚀 **Envío Semi-Automático 100% Gratuito** - {describe_pacing(st.session_state.get('pacing') or DEFAULT_PACING)}")
 st.markdown("---")
 
 # Paso 1: Cargar archivo
 st.header("1️⃣ Cargar Base de Datos")
 
 uploaded_file = st.file_uploader(
-    "Selecciona tu archivo Excel (.xlsx)",
-    type=['xlsx'],
+    "Selecciona tu archivo (.xlsx, .csv o .parquet)",
+    type=SUPPORTED_EXTENSIONS,
     help="El archivo debe contener al menos una columna con números de teléfono"
 )
 
 if uploaded_file is not None:
     try:
-        df = pd.read_excel(uploaded_file)
+        file_bytes = uploaded_file.getvalue()
+        file_hash = hash_file_bytes(file_bytes)
+        row_counter = st.empty()
+        df = cached_read_contacts(
+            file_hash, uploaded_file.name, file_bytes,
+            progress=lambda rows_read: row_counter.caption(f"⏳ Leyendo archivo... {rows_read:,} registros"),
+            context=st.session_state.session_tag
+        )
+        row_counter.empty()
         st.session_state.df = df
+        st.session_state.file_hash = file_hash
         st.success(f"✅ Archivo cargado exitosamente: {len(df)} registros encontrados")
         
         st.subheader("📊 Vista previa de los datos")
@@ -296,69 +367,160 @@ if st.session_state.df is not None:
         options=st.session_state.df.columns.tolist(),
         help="Selecciona la columna que contiene los números de WhatsApp"
     )
+    default_country = st.selectbox(
+        "País de los números sin indicativo",
+        options=list(NUMBERING_PLANS),
+        index=list(NUMBERING_PLANS).index(DEFAULT_COUNTRY),
+        format_func=lambda country: f"{NUMBERING_PLANS[country]['name']} (+{NUMBERING_PLANS[country]['country_code']})",
+        help="Los números con + o 00 se reconocen por su indicativo, sin importar este valor"
+    )
     
     if st.button("✅ Confirmar Columna de Números"):
         st.session_state.number_column = number_column
+        st.session_state.default_country = default_country
         st.session_state.column_selected = True
         st.rerun()
 
-# Paso 3: Validar números
+# Paso 3: Validar números (en segundo plano; la página sigue respondiendo)
+validation = None
 if st.session_state.get('column_selected', False):
     st.markdown("---")
     st.header("3️⃣ Validación de Números")
     
     df = st.session_state.df
     number_col = st.session_state.number_column
+    default_country = st.session_state.get('default_country', DEFAULT_COUNTRY)
     
-    valid_numbers = []
-    invalid_numbers = []
-    
-    for index, row in df.iterrows():
-        number = row[number_col]
-        is_valid, clean_number = validate_colombian_number(number)
-        
-        if is_valid:
-            valid_numbers.append({
-                'index': index,
-                'original': number,
-                'clean': clean_number,
-                'url_format': format_number_for_url(clean_number),
-                'full_number': f"+57{clean_number}"
-            })
-        else:
-            invalid_numbers.append({
-                'index': index,
-                'original': number,
-                'reason': 'Formato inválido o no es número colombiano'
-            })
+    validation = background_result(
+        'validation_job', f"validate|{st.session_state.file_hash}|{number_col}|{default_country}",
+        "Validando números", validate_numbers,
+        df[number_col], default_country, get_process_pool(), get_stage_recorder(), st.session_state.session_tag,
+        cache=get_validation_results()
+    )
+
+if validation is not None:
+    valid_mask = validation['valid']
+    valid_count = int(valid_mask.sum())
+    invalid_count = len(validation) - valid_count
     
     col1, col2 = st.columns(2)
     with col1:
-        st.metric("✅ Números Válidos", len(valid_numbers))
+        st.metric("✅ Números Válidos", valid_count)
     with col2:
-        st.metric("❌ Números Inválidos", len(invalid_numbers))
-    
-    if invalid_numbers:
-        st.warning("⚠️ Se encontraron números con formato inválido:")
-        st.dataframe(pd.DataFrame(invalid_numbers))
-        st.info("💡 **Formato correcto:** 10 dígitos que empiecen con 3 (ej: 3008686725)")
-    
-    if valid_numbers:
-        st.success(f"🎉 {len(valid_numbers)} números están listos para envío")
+        st.metric("❌ Números Inválidos", invalid_count)
+    
+    if valid_count:
+        country_counts = validation['country'][valid_mask].value_counts()
+        if len(country_counts) > 1 or country_counts.index[0] != default_country:
+            st.write("**🌎 Países detectados:**")
+            st.dataframe(pd.DataFrame({
+                'país': [NUMBERING_PLANS[country]['name'] for country in country_counts.index],
+                'números': country_counts.values
+            }), hide_index=True)
+    
+    if invalid_count:
+        st.warning(f"⚠️ Se encontraron {invalid_count:,} números con formato inválido:")
+        reason_counts = validation['reason'][~valid_mask].value_counts()
+        st.dataframe(pd.DataFrame({
+            'motivo': reason_counts.index,
+            'números': reason_counts.values
+        }), hide_index=True)
+        with st.expander("🔍 Ver números inválidos"):
+            reason = st.selectbox("Motivo", options=['Todos', *reason_counts.index])
+            invalid_rows = ~valid_mask if reason == 'Todos' else validation['reason'] == reason
+            paginated_table(
+                invalid_rows.to_numpy().nonzero()[0],
+                lambda page: pd.DataFrame({
+                    'index': df.index[page],
+                    'original': df[number_col].iloc[page].values,
+                    'reason': validation['reason'].iloc[page].values
+                }),
+                key='invalid_page'
+            )
+        st.info("💡 **Formato correcto:** celular sin indicativo del país por defecto (ej: 3008686725) "
+                "o con indicativo internacional (ej: +57 300 868 6725, +34 612 345 678)")
+    
+    if valid_count:
+        st.subheader("🧹 Duplicados y Listas de Supresión")
+        suppression = get_suppression_store()
+        suppression_lists = suppression.lists()
+        list_labels = {CONTACTED_LIST: "📤 Ya contactados en campañas anteriores"}
+        list_labels.update({name: f"🚫 {name} ({count} números)" for name, count in suppression_lists.items()})
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            keep = st.radio("Números repetidos", options=list(DEDUPE_OPTIONS), format_func=DEDUPE_OPTIONS.get)
+        with col2:
+            selected_lists = st.multiselect("No enviar a los números de:", options=list(list_labels), format_func=list_labels.get)
+        
+        duplicates = cached_duplicates(
+            st.session_state.file_hash, number_col, default_country, keep, validation, st.session_state.session_tag
+        )
+        phones = cached_phones(st.session_state.file_hash, number_col, default_country, validation)
+        suppressed = suppression.contains(phones, [name for name in selected_lists if name != CONTACTED_LIST])
+        if CONTACTED_LIST in selected_lists:
+            suppressed |= sorted_membership(phones, get_send_journal().contacted_phones())
+        suppressed &= valid_mask.to_numpy() & ~duplicates
+        duplicate_count = int(duplicates.sum())
+        suppressed_count = int(suppressed.sum())
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("🔁 Duplicados Eliminados", duplicate_count)
+        with col2:
+            st.metric("🚫 Suprimidos", suppressed_count)
+        
+        with st.expander("🚫 Administrar listas de supresión"):
+            list_name = st.text_input("Nombre de la lista", value="no_contactar")
+            pasted_numbers = st.text_area("Números (uno por línea)", height=120)
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("➕ Agregar a la lista") and list_name.strip() and pasted_numbers.strip():
+                    pasted_validation = validate_phone_numbers(pd.Series(pasted_numbers.splitlines()), default_country)
+                    pasted_phones = phones_as_int(pasted_validation)[pasted_validation['valid'].to_numpy()]
+                    added = suppression.add(list_name.strip(), pasted_phones, reason='manual')
+                    st.toast(f"✅ {added} números nuevos en '{list_name.strip()}' "
+                               f"({len(pasted_validation) - len(pasted_phones)} inválidos ignorados)")
+                    st.rerun()
+            with col2:
+                if suppression_lists and st.button("🗑️ Eliminar lista", disabled=list_name.strip() not in suppression_lists):
+                    suppression.remove(list_name.strip())
+                    st.rerun()
+        
+        sendable_count = valid_count - duplicate_count - suppressed_count
+        if sendable_count:
+            st.success(f"🎉 {sendable_count} números están listos para envío")
+        else:
+            st.error("❌ No quedan números para enviar después de quitar duplicados y suprimidos")
         
-        if st.checkbox("Ver muestra de números válidos"):
-            st.dataframe(pd.DataFrame(valid_numbers[:10]))
+        if st.checkbox("Ver números válidos"):
+            def valid_page(page):
+                sample = validation.iloc[page]
+                return pd.DataFrame({
+                    'index': sample.index,
+                    'original': df[number_col].iloc[page].values,
+                    'country': sample['country'].values,
+                    'clean': sample['clean'].values,
+                    'url_format': sample['url_format'].values,
+                    'full_number': ('+' + sample['url_format']).values
+                })
+            paginated_table(valid_mask.to_numpy().nonzero()[0], valid_page, key='valid_page')
         
         col1, col2 = st.columns(2)
         with col1:
             if st.button("🔄 Cargar Nueva Base", type="secondary"):
-                for key in ['df', 'column_selected', 'numbers_validated', 'message_ready', 'sending_complete']:
+                for key in ['df', 'campaign', 'contacts_campaign', 'url_length_stats', 'oversized', 'report_inputs', 'column_selected', 'numbers_validated', 'message_ready', 'sending_complete']:
                     if key in st.session_state: del st.session_state[key]
                 st.rerun()
         
         with col2:
-            if st.button("✅ Continuar", type="primary"):
-                st.session_state.valid_numbers = valid_numbers
+            if st.button("✅ Continuar", type="primary", disabled=not sendable_count):
+                st.session_state.contacts_campaign = Campaign.from_validation(
+                    df, validation, exclude=duplicates | suppressed,
+                    texts=cached_column_texts(st.session_state.file_hash, df)
+                )
+                st.session_state.campaign = st.session_state.contacts_campaign
+                st.session_state.report_inputs = (validation, duplicates, suppressed)
                 st.session_state.numbers_validated = True
                 st.rerun()
     else:
@@ -395,26 +557,116 @@ Quedo atenta a la fecha que elija."""
 
     message_template = st.text_area("Escribe tu mensaje:", value=default_message, height=300)
     
-    # Fixed delay of 15 seconds
-    delay = 15
-    st.info(f"⏰ **Delay fijo:** 15 segundos entre cada mensaje")
+    with st.expander("⏰ Ritmo de envío"):
+        pacing_mode = st.radio(
+            "Modo",
+            options=list(PACING_MODES),
+            format_func=PACING_MODES.get,
+            horizontal=True
+        )
+        if pacing_mode == 'token_bucket':
+            col1, col2 = st.columns(2)
+            with col1:
+                rate = st.number_input("Mensajes por ventana", min_value=1, max_value=100, value=4)
+            with col2:
+                window = st.number_input("Ventana (segundos)", min_value=10, max_value=3600, value=60)
+            pacing = build_pacing(pacing_mode, rate=rate, window=window)
+        else:
+            delay = st.number_input("Segundos entre mensajes", min_value=5, max_value=600, value=15)
+            jitter = 0
+            if pacing_mode == 'jitter':
+                jitter = st.number_input("Variación aleatoria (± segundos)", min_value=0, max_value=300, value=5)
+            pacing = build_pacing(pacing_mode, delay=delay, jitter=jitter)
+    st.info(f"⏰ **Ritmo de envío:** {describe_pacing(pacing)}")
     
     st.subheader("👁️ Vista Previa del Mensaje")
     
-    if st.session_state.valid_numbers:
-        sample_row = df.iloc[st.session_state.valid_numbers[0]['index']]
+    # Campaña sin plantilla (válidos sin duplicados ni suprimidos): base de cada versión del mensaje
+    contacts_campaign = st.session_state.contacts_campaign
+    if len(contacts_campaign):
+        sample_row = contacts_campaign.rows(0, 1).iloc[0]
         try:
-            preview_message = message_template
-            for col in df.columns:
-                value = str(sample_row[col]) if pd.notna(sample_row[col]) else ""
-                preview_message = preview_message.replace(f"{{{col}}}", value)
+            compiled_template = compile_message_template(message_template, df.columns)
+            preview_message = render_message(compiled_template, sample_row)
             st.text_area("Así se verá:", preview_message, height=200, disabled=True)
         except Exception as e:
             st.error(f"Error en vista previa: {str(e)}")
     
-    if st.button("📝 Confirmar Mensaje", type="primary"):
+    # Largo de las URLs de toda la campaña: las que no caben se ven ahora y no al enviarlas
+    st.subheader("📏 Largo de las URLs")
+    url_budget = int(st.number_input(
+        "Largo máximo de cada URL (caracteres)", min_value=200, max_value=100000, value=URL_LENGTH_BUDGET, step=100,
+        help="Las URLs más largas pueden no abrirse o llegar cortadas a WhatsApp Web. "
+             "Las tildes y emojis ocupan hasta 3 veces más en la URL."
+    ))
+    stats = url_length_stats(contacts_campaign, message_template, url_budget)
+    draft_campaign, url_lengths = stats['campaign'], stats['lengths']
+    url_summary, oversized_urls = stats['summary'], stats['over']
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Mediana", url_summary['p50'])
+    with col2:
+        st.metric("Percentil 95", url_summary['p95'])
+    with col3:
+        st.metric("Máximo", url_summary['max'])
+    with col4:
+        st.metric("📏 Sobre el límite", url_summary['over'])
+    if stats['histogram'] is not None:
+        counts, edges = stats['histogram']
+        st.bar_chart(pd.DataFrame({'contactos': counts}, index=pd.Index(edges[:-1].astype(int), name='caracteres')))
+    url_overflow = 'warn'
+    removed_urls = oversized_urls
+    if url_summary['over']:
+        st.warning(f"⚠️ {url_summary['over']:,} URLs pasan de {url_budget} caracteres")
+        url_overflow = st.radio(
+            "Qué hacer con esos contactos",
+            options=list(URL_OVERFLOW_ACTIONS),
+            format_func=URL_OVERFLOW_ACTIONS.get,
+            horizontal=True
+        )
+        if url_overflow == 'truncate':
+            # Las que no caben ni con un carácter del mensaje se quitan: no se envían mensajes vacíos
+            if stats['untruncatable'] is None:
+                stats['untruncatable'] = draft_campaign.untruncatable(url_budget, url_lengths)
+            removed_urls = stats['untruncatable']
+            if removed_urls.any():
+                st.warning(f"⚠️ {removed_urls.sum():,} URLs no caben ni recortando el mensaje: "
+                           "esos contactos se quitan de la campaña")
+        with st.expander("🔍 Ver contactos con la URL muy larga"):
+            paginated_table(
+                np.flatnonzero(oversized_urls),
+                lambda page: pd.DataFrame({
+                    'fila': draft_campaign.positions[page] + 1,
+                    'numero': '+' + draft_campaign.phones[page].astype(str),
+                    'largo': url_lengths[page],
+                }),
+                key='oversized_page'
+            )
+    else:
+        st.success(f"✅ Todas las URLs caben en {url_budget} caracteres")
+    
+    no_contacts_left = url_overflow != 'warn' and removed_urls.all()
+    if no_contacts_left:
+        st.error("❌ No quedan contactos si se quitan las URLs muy largas: acorta el mensaje o súbele el límite")
+    if st.button("📝 Confirmar Mensaje", type="primary", disabled=no_contacts_left):
+        campaign = draft_campaign
+        st.session_state.oversized = None
+        if url_overflow != 'warn' and removed_urls.any():
+            oversized = np.zeros(len(df), dtype=bool)
+            oversized[campaign.positions[removed_urls]] = True
+            st.session_state.oversized = oversized
+            campaign = campaign.without(removed_urls)
+        if url_overflow == 'truncate':
+            campaign = campaign.with_url_budget(url_budget)
         st.session_state.message_template = message_template
-        st.session_state.delay = delay
+        st.session_state.campaign = campaign
+        st.session_state.pacing = pacing
+        st.session_state.delay = pacing['delay']
+        st.session_state.campaign_id = campaign_storage_id(
+            st.session_state.file_hash, st.session_state.number_column, message_template,
+            st.session_state.campaign.phones
+        )
+        st.session_state.sending_in_progress = False
         st.session_state.message_ready = True
         st.success("✅ Mensaje configurado")
         st.rerun()
@@ -424,46 +676,46 @@ if st.session_state.get('message_ready', False):
     st.markdown("---")
     st.header("5️⃣ Preparar Envío de Mensajes")
     
-    total_messages = len(st.session_state.valid_numbers)
+    campaign = st.session_state.campaign
+    pacing = st.session_state.pacing
+    campaign_id = st.session_state.campaign_id
+    total_messages = len(campaign)
     st.info(f"📊 Preparando **{total_messages}** mensajes de WhatsApp")
-    st.warning(f"⏰ **Cada mensaje se abrirá cada 15 segundos**")
+    st.warning(f"⏰ **Ritmo de envío:** {describe_pacing(pacing)}")
     
     # Calcular tiempo total estimado
-    total_time_seconds = total_messages * 15
+    total_time_seconds = total_messages * seconds_per_message(pacing)
     total_time_minutes = total_time_seconds / 60
     st.info(f"⏳ **Tiempo total estimado:** {total_time_minutes:.1f} minutos")
     
-    # Preparar URLs de WhatsApp
-    whatsapp_urls = []
-    df = st.session_state.df
-    
-    for number_info in st.session_state.valid_numbers:
-        try:
-            row_data = df.iloc[number_info['index']]
-            personalized_message = st.session_state.message_template
-            
-            for col in df.columns:
-                value = str(row_data[col]) if pd.notna(row_data[col]) else ""
-                personalized_message = personalized_message.replace(f"{{{col}}}", value)
-            
-            # Crear información para mostrar
-            display_info = number_info['full_number']
-            if 'NOMBRE' in df.columns and pd.notna(row_data.get('NOMBRE')):
-                display_info += f" - {row_data['NOMBRE']}"
-            if 'EMPRESA' in df.columns and pd.notna(row_data.get('EMPRESA')):
-                display_info += f" ({row_data['EMPRESA']})"
-            
-            whatsapp_urls.append({
-                'numero': number_info['full_number'],
-                'url': generate_whatsapp_url(number_info['url_format'], personalized_message),
-                'mensaje': personalized_message,
-                'display_info': display_info
-            })
-            
-        except Exception as e:
-            st.error(f"Error preparando mensaje: {str(e)}")
-    
-    st.session_state.whatsapp_urls = whatsapp_urls
+    # Los mensajes y URLs se generan al exportar, a partir de la campaña
+    
+    # Diario de envíos: guarda el estado de cada contacto para retomar sin repetir envíos
+    journal = get_send_journal()
+    journal.register_campaign(campaign_id, campaign.phones)
+    panel_key = f"send_panel_{campaign_id}"
+    panel_value = st.session_state.get(panel_key)
+    if panel_value:
+        events = [event for event in panel_value['events'] if event['seq'] > st.session_state.journal_ack]
+        if events:
+            journal.record_many(campaign_id, [(event['index'], event['state'], event['at']) for event in events])
+            st.session_state.journal_ack = max(event['seq'] for event in events)
+        if panel_value.get('need') is not None:
+            st.session_state.send_offset = panel_value['need']
+    
+    counts = journal.state_counts(campaign_id)
+    resume_position = journal.resume_position(campaign_id)
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("⏳ Pendientes", counts['queued'])
+    with col2:
+        st.metric("📤 Abiertos", counts['opened'])
+    with col3:
+        st.metric("✅ Confirmados", counts['confirmed'])
+    with col4:
+        st.metric("❌ Fallidos", counts['failed'])
+    if 0 < resume_position < total_messages:
+        st.info(f"🔁 Esta campaña ya se inició: el envío continúa desde el contacto {resume_position + 1}")
     
     # Mostrar opciones de envío
     st.subheader("🚀 Opciones de Envío")
@@ -471,46 +723,167 @@ if st.session_state.get('message_ready', False):
     col1, col2 = st.columns(2)
     
     with col1:
-        if st.button("📤 Iniciar Envío Automático (15s)", type="primary", use_container_width=True):
-            # Crear JavaScript para abrir enlaces con delay de 15 segundos
-            urls = [item['url'] for item in whatsapp_urls]
-            js_code = create_javascript_opener(urls, 15)
-            st.components.v1.html(js_code, height=0)
+        start_clicked = st.button("📤 Iniciar Envío Automático", type="primary", width="stretch")
+        if start_clicked:
+            st.session_state.sending_in_progress = True
+            st.session_state.send_offset = resume_position
+        
+        if st.session_state.sending_in_progress:
+            offset = st.session_state.get('send_offset', resume_position)
+            stop = offset + SEND_PANEL_PAGE_ROWS
+            with get_stage_recorder().stage('send_panel_page', context=st.session_state.session_tag) as stage:
+                contacts = [list(contact) for contact in zip(campaign.display_info(offset, stop), campaign.urls(offset, stop))]
+                stage['rows'] = len(contacts)
+            send_panel(
+                total=total_messages,
+                offset=offset,
+                contacts=contacts,
+                config={
+                    'pacing': pacing,
+                    'campaignId': campaign_id,
+                    'autoStart': start_clicked,
+                    'startIndex': resume_position,
+                    'journal': True
+                },
+                ack=st.session_state.journal_ack,
+                key=panel_key,
+                default=None
+            )
             
             st.success("🚀 ¡Envío automático iniciado!")
-            st.info("""
+            st.info(f"""
             **📋 Qué está pasando:**
-            - Se abrirá una pestaña de WhatsApp cada **15 segundos**
+            - Se abrirá una pestaña de WhatsApp según el ritmo: **{describe_pacing(pacing)}**
             - El mensaje ya está pre-escrito
             - Solo debes hacer clic en **ENVIAR** manualmente
-            - El proceso continuará automáticamente
+            - Puedes pausar, reanudar o saltar contactos, y marcar cada uno como enviado o fallido
+            - Si se cierra el navegador o se reinicia el servidor, el envío continúa desde el primer contacto pendiente
             """)
     
     with col2:
-        # Descargar HTML con enlaces interactivos
-        html_content = create_html_with_auto_click(whatsapp_urls)
-        b64 = base64.b64encode(html_content.encode()).decode()
-        href = f'<a href="data:text/html;base64,{b64}" download="whatsapp_auto_send.html" style="display:inline-block; background:#25D366; color:white; padding:15px 25px; border-radius:30px; text-decoration:none; font-weight:bold; text-align:center;">📥 Descargar HTML Automático</a>'
-        st.markdown(href, unsafe_allow_html=True)
+        # HTML con enlaces interactivos: se genera en segundo plano y luego se descarga
+        export_key = f"html|{campaign_id}|{sorted(pacing.items())}"
+        if st.session_state.get('export_requested') == export_key:
+            html_file = background_file(
+                'export_job', export_key, "Generando HTML", prepare_html_export,
+                campaign, pacing, campaign_id, get_process_pool(), get_stage_recorder(), st.session_state.session_tag,
+                cleanup=os.remove
+            )
+            if html_file is not None:
+                st.download_button(
+                    "📥 Descargar HTML Automático",
+                    data=html_file[1],
+                    file_name="whatsapp_auto_send.html",
+                    mime="text/html",
+                    type="primary",
+                    width="stretch"
+                )
+        elif st.button("📦 Preparar HTML Automático", type="primary", width="stretch"):
+            st.session_state.export_requested = export_key
+            st.rerun()
         st.caption("Descarga este archivo y ábrelo en tu navegador para envío automático con timer")
+    
+    # Lotes por operador: cada uno envía su parte, sin repetir contactos, desde su propio navegador
+    with st.expander("👥 Repartir entre varios operadores"):
+        operator_count = int(st.number_input("Operadores", min_value=1, max_value=MAX_OPERATORS, value=2, step=1))
+        operators = st.data_editor(
+            pd.DataFrame({
+                'operador': [f"Operador {index + 1}" for index in range(operator_count)],
+                'capacidad': [1.0] * operator_count,
+            }),
+            column_config={
+                'capacidad': st.column_config.NumberColumn(
+                    min_value=0.0, help="Capacidad relativa: con 2, el operador recibe el doble de contactos"
+                )
+            },
+            hide_index=True,
+            width="stretch",
+            key=f"operators_{operator_count}"
+        )
+        weights = operators['capacidad'].fillna(0).astype(float).tolist()
+        names = [name or f"Operador {index + 1}" for index, name in enumerate(operators['operador'].fillna(''))]
+        try:
+            manifest = shard_manifest(shard_bounds(total_messages, weights), pacing, names)
+        except ValueError as e:
+            st.error(f"❌ {e}")
+        else:
+            st.dataframe(
+                pd.DataFrame(manifest)[['operador', 'contactos', 'primer_contacto', 'ultimo_contacto', 'fin_estimado']],
+                hide_index=True,
+                width="stretch"
+            )
+            shards_key = f"shards|{campaign_id}|{sorted(pacing.items())}|{weights}|{names}"
+            if st.session_state.get('shards_requested') == shards_key:
+                bundle = background_file(
+                    'shards_job', shards_key, "Generando lotes", prepare_shard_bundle,
+                    campaign, weights, pacing, campaign_id, names, get_process_pool(), get_stage_recorder(),
+                    st.session_state.session_tag,
+                    cleanup=lambda result: os.remove(result[0]), path_of=lambda result: result[0]
+                )
+                if bundle is not None:
+                    st.download_button(
+                        "📥 Descargar lotes (ZIP)",
+                        data=bundle[1],
+                        file_name="whatsapp_lotes.zip",
+                        mime="application/zip",
+                        type="primary",
+                        width="stretch"
+                    )
+            elif st.button("📦 Preparar lotes", width="stretch"):
+                st.session_state.shards_requested = shards_key
+                st.rerun()
+            st.caption("El ZIP trae un HTML y una lista de URLs por operador y un manifiesto con el fin estimado de cada lote")
+    
+    # Reporte: una fila por contacto del archivo (válido, inválido, duplicado o suprimido) con su estado de envío
+    st.subheader("📊 Reporte de Resultados")
+    report_format = st.radio(
+        "Formato del reporte",
+        options=list(REPORT_FORMATS),
+        format_func=lambda fmt: REPORT_FORMATS[fmt]['label'],
+        horizontal=True
+    )
+    # Los conteos forman parte de la clave: si avanza el envío, el reporte se vuelve a generar
+    report_key = f"report|{campaign_id}|{report_format}|{sorted(counts.items())}"
+    if st.session_state.get('report_requested') == report_key:
+        report_validation, report_duplicates, report_suppressed = st.session_state.report_inputs
+        report_file = background_file(
+            'report_job', report_key, "Generando reporte", prepare_report,
+            st.session_state.df, st.session_state.number_column, report_validation, campaign,
+            report_duplicates, report_suppressed, st.session_state.get('oversized'),
+            journal, campaign_id, report_format, get_stage_recorder(), st.session_state.session_tag,
+            cleanup=os.remove
+        )
+        if report_file is not None:
+            st.download_button(
+                "📥 Descargar Reporte",
+                data=report_file[1],
+                file_name=f"reporte_whatsapp.{report_format}",
+                mime=REPORT_FORMATS[report_format]['mime'],
+                type="primary"
+            )
+    elif st.button("📦 Preparar Reporte"):
+        st.session_state.report_requested = report_key
+        st.rerun()
+    st.caption("Incluye números válidos, inválidos, duplicados y suprimidos, el estado de envío y la URL de cada contacto. "
+               "Para listas muy grandes, CSV o Parquet se generan mucho más rápido que Excel.")
 
 # Sidebar informativo
 st.sidebar.header("ℹ️ AutoWhatSend Gratis")
 st.sidebar.markdown("""
 ### 🚀 Cómo funciona:
 
-**⏰ Delay de 15 segundos** entre cada mensaje
+**⏰ Ritmo configurable** entre cada mensaje (paso 4)
 
 **Método 1: Envío Directo**
 - Haz clic en "Iniciar Envío Automático"
-- Se abrirán pestañas cada **15 segundos**
+- Se abrirán pestañas según el **ritmo elegido**
 - Solo debes hacer clic en **ENVIAR**
 
 **Método 2: HTML Descargable**
 - Descarga el archivo HTML
 - Ábrelo en tu navegador
 - Haz clic en "Iniciar Envío Automático"
-- Timer integrado de 15 segundos
+- Timer integrado con el mismo ritmo
 
 ### ⚠️ Requisitos:
 - WhatsApp Web abierto y logueado
@@ -520,21 +893,53 @@ st.sidebar.markdown("""
 ### 💡 Tips:
 1. Abre WhatsApp Web primero
 2. Mantén la sesión activa
-3. Usa el delay de 15 segundos
+3. Usa un ritmo pausado entre mensajes
 4. Revisa cada mensaje antes de enviar
 """)
 
 st.sidebar.markdown("---")
 st.sidebar.success("**✅ 100% Gratuito** - Sin APIs costosas")
-st.sidebar.info("**⏰ Delay:** 15 segundos entre mensajes")
+st.sidebar.info(f"**⏰ Ritmo:** {describe_pacing(st.session_state.get('pacing') or DEFAULT_PACING)}")
 st.sidebar.markdown("**🌐 Compatible** - Funciona en Streamlit Cloud")
 
+# Panel de rendimiento: etapas medidas en esta sesión (o en todas)
+with st.sidebar.expander("📊 Rendimiento por etapa"):
+    stage_recorder = get_stage_recorder()
+    all_sessions = st.checkbox("Ver todas las sesiones")
+    stage_records = stage_recorder.recent(None if all_sessions else st.session_state.session_tag)
+    if stage_records:
+        st.dataframe(pd.DataFrame({
+            'etapa': [record['stage'] for record in stage_records],
+            'filas': [record['rows'] for record in stage_records],
+            'segundos': [record['seconds'] for record in stage_records],
+            'filas/s': [record['rows_per_second'] for record in stage_records],
+            # Pico de memoria durante la etapa (tracemalloc si está activo; si no, memoria residente)
+            'pico de memoria (MB)': [
+                round(memory / 2**20, 1) if memory is not None else None
+                for memory in (stage_memory_bytes(record) for record in stage_records)
+            ],
+            'error': [record['error'] or '' for record in stage_records],
+        }), hide_index=True)
+    else:
+        st.caption("Todavía no hay etapas medidas")
+    if stage_recorder.profile_armed:
+        st.info("🔬 La próxima etapa se perfilará con cProfile")
+    elif st.button("🔬 Perfilar la próxima etapa"):
+        stage_recorder.profile_next()
+        st.rerun()
+    profiled = next((record for record in stage_records if record.get('profile')), None)
+    if profiled:
+        st.caption(f"Perfil de **{profiled['stage']}**" + (f" (`{profiled['profile_path']}`)" if profiled['profile_path'] else ""))
+        st.code(profiled['profile'], language=None)
+    if STAGE_LOG_PATH:
+        st.caption(f"Log por etapa: `{STAGE_LOG_PATH}`")
+
 # Footer
 st.markdown("---")
-st.markdown("""
+st.markdown(f"""
 <div style='text-align: center; color: #666; margin-top: 50px;'>
     <p>🚀 <strong>AutoWhatSend Gratis</strong> - Envío semi-automático de WhatsApp</p>
-    <p>⏰ <strong>Delay:</strong> 15 segundos entre cada mensaje</p>
+    <p>⏰ <strong>Ritmo:</strong> {describe_pacing(st.session_state.get('pacing') or DEFAULT_PACING)}</p>
     <p>💡 Recuerda: Debes hacer clic en ENVIAR manualmente en cada pestaña</p>
 </div>
 """, unsafe_allow_html=True)
@@ -0,0 +1,168 @@
+"""AutoWhatSend: validación de números, mensajes personalizados y exportación de campañas.
+
+Se puede importar sin Streamlit. pandas, openpyxl, pyarrow y xlsxwriter se
+importan solo dentro de las funciones que los usan.
+"""
+from .campaign import CAMPAIGN_CHUNK_ROWS, Campaign, campaign_storage_id
+from .export import (
+    create_excel_download,
+    create_html_with_auto_click,
+    export_html_file,
+    export_html_path,
+    iter_html_export,
+    write_html_export,
+)
+from .ingest import SUPPORTED_EXTENSIONS, hash_file, hash_file_bytes, iter_contact_chunks, read_contacts
+from .instrumentation import STAGE_HISTORY, StageRecorder, stage_memory_bytes
+from .jobs import JOB_STATES, JOB_WORKERS, Job, JobCancelled, JobRunner, ResultCache, iter_with_progress
+from .journal import DEFAULT_JOURNAL_PATH, SEND_STATES, SendJournal
+from .messages import (
+    URL_LENGTH_BUDGET,
+    URL_OVERFLOW_ACTIONS,
+    WHATSAPP_SEND_URL,
+    ColumnTexts,
+    build_display_info,
+    can_truncate,
+    compile_message_template,
+    encoded_message_lengths,
+    generate_whatsapp_url,
+    generate_whatsapp_urls,
+    render_message,
+    render_messages,
+    template_placeholders,
+    truncate_message,
+    url_length_summary,
+)
+from .parallel import (
+    PARALLEL_CHUNK_ROWS,
+    create_process_pool,
+    iter_records_parallel,
+    map_campaign,
+    validate_phone_numbers_parallel,
+)
+from .phones import (
+    DEFAULT_COUNTRY,
+    INVALID_NUMBER_REASON,
+    INVALID_REASONS,
+    NUMBERING_PLANS,
+    compile_numbering_plans,
+    format_number_for_url,
+    numbering_table,
+    validate_colombian_number,
+    validate_colombian_numbers,
+    validate_phone_numbers,
+)
+from .report import (
+    REPORT_CHUNK_ROWS,
+    REPORT_COLUMNS,
+    REPORT_FORMATS,
+    export_report_path,
+    iter_report_chunks,
+    report_statuses,
+    write_table,
+)
+from .sender import (
+    DEFAULT_PACING,
+    PACING_MODES,
+    STATIC_DIR,
+    build_pacing,
+    create_javascript_opener,
+    describe_pacing,
+    seconds_per_message,
+)
+from .shards import (
+    export_shard_bundle_path,
+    parse_shard_weights,
+    shard_bounds,
+    shard_manifest,
+    shard_sizes,
+    shard_storage_id,
+    write_shard_bundle,
+)
+from .suppression import DEDUPE_OPTIONS, SuppressionStore, find_duplicates, phones_as_int, sorted_membership
+
+__all__ = [
+    'CAMPAIGN_CHUNK_ROWS',
+    'Campaign',
+    'campaign_storage_id',
+    'create_excel_download',
+    'create_html_with_auto_click',
+    'export_html_file',
+    'export_html_path',
+    'iter_html_export',
+    'write_html_export',
+    'JOB_STATES',
+    'JOB_WORKERS',
+    'Job',
+    'JobCancelled',
+    'JobRunner',
+    'ResultCache',
+    'iter_with_progress',
+    'DEFAULT_JOURNAL_PATH',
+    'SEND_STATES',
+    'SendJournal',
+    'SUPPORTED_EXTENSIONS',
+    'hash_file',
+    'hash_file_bytes',
+    'iter_contact_chunks',
+    'read_contacts',
+    'STAGE_HISTORY',
+    'StageRecorder',
+    'stage_memory_bytes',
+    'URL_LENGTH_BUDGET',
+    'URL_OVERFLOW_ACTIONS',
+    'WHATSAPP_SEND_URL',
+    'ColumnTexts',
+    'build_display_info',
+    'can_truncate',
+    'compile_message_template',
+    'encoded_message_lengths',
+    'generate_whatsapp_url',
+    'generate_whatsapp_urls',
+    'render_message',
+    'render_messages',
+    'template_placeholders',
+    'truncate_message',
+    'url_length_summary',
+    'PARALLEL_CHUNK_ROWS',
+    'create_process_pool',
+    'iter_records_parallel',
+    'map_campaign',
+    'validate_phone_numbers_parallel',
+    'DEFAULT_COUNTRY',
+    'INVALID_NUMBER_REASON',
+    'INVALID_REASONS',
+    'NUMBERING_PLANS',
+    'compile_numbering_plans',
+    'format_number_for_url',
+    'numbering_table',
+    'validate_colombian_number',
+    'validate_colombian_numbers',
+    'validate_phone_numbers',
+    'REPORT_CHUNK_ROWS',
+    'REPORT_COLUMNS',
+    'REPORT_FORMATS',
+    'export_report_path',
+    'iter_report_chunks',
+    'report_statuses',
+    'write_table',
+    'DEFAULT_PACING',
+    'PACING_MODES',
+    'STATIC_DIR',
+    'build_pacing',
+    'create_javascript_opener',
+    'describe_pacing',
+    'seconds_per_message',
+    'export_shard_bundle_path',
+    'parse_shard_weights',
+    'shard_bounds',
+    'shard_manifest',
+    'shard_sizes',
+    'shard_storage_id',
+    'write_shard_bundle',
+    'DEDUPE_OPTIONS',
+    'SuppressionStore',
+    'find_duplicates',
+    'phones_as_int',
+    'sorted_membership',
+]
@@ -0,0 +1,5 @@
+from .cli import main
+
+# Protegido: los procesos del pool (spawn) vuelven a importar este módulo
+if __name__ == '__main__':
+    raise SystemExit(main())
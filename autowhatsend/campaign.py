@@ -0,0 +1,179 @@
+"""Campaña compacta: filas válidas y números en arreglos tipados"""
+import hashlib
+import urllib.parse
+
+from .messages import (
+    TRUNCATION_MARK,
+    ColumnTexts,
+    build_display_info,
+    can_truncate,
+    compile_message_template,
+    encoded_message_lengths,
+    generate_whatsapp_urls,
+    render_messages,
+    truncate_message,
+    url_overhead,
+)
+
+CAMPAIGN_CHUNK_ROWS = 10000
+
+class Campaign:
+    """Campaña compacta: posiciones de fila y números en arreglos tipados.
+
+    Los mensajes y URLs no se guardan; se generan por bloques a partir del
+    DataFrame original cuando se muestran o exportan. El texto de cada columna
+    que usa la plantilla se calcula una sola vez (texts, un ColumnTexts del
+    DataFrame), así que cambiar la plantilla solo procesa las columnas nuevas.
+    Con url_budget, los mensajes cuya URL pasaría de ese largo se recortan;
+    los que no caben ni recortados (untruncatable) hay que quitarlos antes.
+    """
+    __slots__ = ('df', 'positions', 'phones', 'template', 'texts', 'send_url', 'url_budget')
+
+    def __init__(self, df, positions, phones, template=None, texts=None, send_url=None, url_budget=None):
+        self.df = df
+        self.positions = positions
+        self.phones = phones
+        self.template = template
+        self.texts = texts if texts is not None else ColumnTexts(df)
+        self.send_url = send_url
+        self.url_budget = url_budget
+
+    @classmethod
+    def from_validation(cls, df, validation, exclude=None, texts=None):
+        """Crea la campaña con las filas válidas de validate_phone_numbers.
+
+        exclude (booleano por fila) quita además duplicados o números suprimidos.
+        texts reutiliza el ColumnTexts de otra campaña del mismo DataFrame.
+        """
+        import numpy as np
+        valid = validation['valid'].to_numpy()
+        if exclude is not None:
+            valid = valid & ~np.asarray(exclude, dtype=bool)
+        positions = np.flatnonzero(valid).astype(np.int64)
+        phones = validation['url_format'][valid].astype(np.int64).to_numpy()
+        return cls(df, positions, phones, texts=texts)
+
+    def with_template(self, message_template):
+        """Misma campaña (sin copiar arreglos ni textos calculados) con la plantilla compilada"""
+        return Campaign(self.df, self.positions, self.phones,
+                        compile_message_template(message_template, self.df.columns), self.texts, self.send_url,
+                        self.url_budget)
+
+    def with_send_url(self, send_url):
+        """Misma campaña con otra dirección de envío (None: WHATSAPP_SEND_URL)"""
+        return Campaign(self.df, self.positions, self.phones, self.template, self.texts, send_url, self.url_budget)
+
+    def with_url_budget(self, url_budget):
+        """Misma campaña recortando los mensajes cuya URL pase de url_budget caracteres (None: sin recortar)"""
+        return Campaign(self.df, self.positions, self.phones, self.template, self.texts, self.send_url, url_budget)
+
+    def without(self, mask):
+        """Misma campaña sin los contactos marcados (booleano por contacto, p. ej. URLs muy largas)"""
+        import numpy as np
+        keep = ~np.asarray(mask, dtype=bool)
+        return Campaign(self.df, self.positions[keep], self.phones[keep], self.template, self.texts, self.send_url,
+                        self.url_budget)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def slice(self, start=0, stop=None):
+        """Subcampaña que solo guarda sus propias filas, para enviarla a otro proceso"""
+        import numpy as np
+        rows = self.rows(start, stop)
+        return Campaign(rows, np.arange(len(rows), dtype=np.int64), self.phones[start:stop], self.template,
+                        send_url=self.send_url, url_budget=self.url_budget)
+
+    def rows(self, start=0, stop=None):
+        return self.df.iloc[self.positions[start:stop]]
+
+    def url_numbers(self, start=0, stop=None):
+        """Números con indicativo (573008686725), como texto"""
+        import pandas as pd
+        rows_index = self.df.index[self.positions[start:stop]]
+        return pd.Series(self.phones[start:stop], index=rows_index).astype(str).astype(object)
+
+    def full_numbers(self, start=0, stop=None):
+        return "+" + self.url_numbers(start, stop)
+
+    def _column_texts(self, start, stop):
+        positions = self.positions[start:stop]
+        index = self.df.index[positions]
+        return lambda col, encoded: self.texts.take(col, positions, index, encoded)
+
+    def _message_room(self, start, stop, budget=None):
+        """Caracteres que le quedan al mensaje codificado dentro de budget (o url_budget), por contacto"""
+        import numpy as np
+        digits = np.char.str_len(self.phones[start:stop].astype(str))
+        return (self.url_budget if budget is None else budget) - url_overhead(self.send_url) - digits
+
+    def url_lengths(self, start=0, stop=None):
+        """Largo de la URL de cada contacto (sin recortar), calculado sin armar las URLs"""
+        import numpy as np
+        positions = self.positions[start:stop]
+        column_lengths = lambda col: (self.texts.encoded_lengths(col)[positions], self.texts.braces(col)[positions])
+        lengths = encoded_message_lengths(self.template, self.rows(start, stop), column_lengths)
+        return lengths + url_overhead(self.send_url) + np.char.str_len(self.phones[start:stop].astype(str))
+
+    def untruncatable(self, budget, lengths=None):
+        """Contactos cuya URL pasa de budget aunque se recorte el mensaje (booleano por contacto).
+
+        lengths: url_lengths() ya calculado. Solo se arman los mensajes de los contactos
+        con poco lugar: un carácter codificado ocupa a lo sumo 12.
+        """
+        import numpy as np
+        lengths = self.url_lengths() if lengths is None else lengths
+        room = self._message_room(0, None, budget)
+        tight = np.flatnonzero((lengths > budget) & (room < len(urllib.parse.quote(TRUNCATION_MARK)) + 12))
+        blocked = np.zeros(len(self), dtype=bool)
+        if len(tight):
+            candidates = Campaign(self.df, self.positions[tight], self.phones[tight], self.template, self.texts,
+                                  self.send_url)
+            blocked[tight] = [not can_truncate(message, limit)
+                              for message, limit in zip(candidates.messages(), room[tight])]
+        return blocked
+
+    def messages(self, start=0, stop=None):
+        messages = render_messages(self.template, self.rows(start, stop), column_texts=self._column_texts(start, stop))
+        if self.url_budget is not None:
+            room = self._message_room(start, stop)
+            over = self.url_lengths(start, stop) > self.url_budget
+            if over.any():
+                messages[over] = [truncate_message(message, limit) for message, limit in zip(messages[over], room[over])]
+        return messages
+
+    def urls(self, start=0, stop=None):
+        encoded = render_messages(self.template, self.rows(start, stop), encoded=True,
+                                  column_texts=self._column_texts(start, stop))
+        if self.url_budget is not None:
+            room = self._message_room(start, stop)
+            over = encoded.str.len().to_numpy() > room
+            if over.any():
+                # unquote deshace exactamente quote: se recorta el texto y se vuelve a codificar
+                encoded[over] = [urllib.parse.quote(truncate_message(urllib.parse.unquote(text), limit))
+                                 for text, limit in zip(encoded[over], room[over])]
+        return generate_whatsapp_urls(self.url_numbers(start, stop), encoded, self.send_url)
+
+    def display_info(self, start=0, stop=None):
+        return build_display_info(self.full_numbers(start, stop), self.rows(start, stop))
+
+    def iter_records(self, chunk_rows=CAMPAIGN_CHUNK_ROWS):
+        """Genera por bloques los datos de cada contacto (numero, url, mensaje, display_info)"""
+        for start in range(0, len(self), chunk_rows):
+            stop = start + chunk_rows
+            columns = zip(self.full_numbers(start, stop), self.urls(start, stop),
+                          self.messages(start, stop), self.display_info(start, stop))
+            for numero, url, mensaje, info in columns:
+                yield {'numero': numero, 'url': url, 'mensaje': mensaje, 'display_info': info}
+
+def campaign_storage_id(file_hash, number_column, message_template, phones=None):
+    """Identificador estable de la campaña, usado para guardar el avance en el navegador.
+
+    Con phones (Campaign.phones) el identificador cambia si cambian los contactos
+    incluidos, p. ej. al quitar duplicados o números suprimidos, y las posiciones
+    guardadas nunca apuntan a otro contacto.
+    """
+    digest = hashlib.sha256(f"{file_hash}|{number_column}|{message_template}".encode())
+    if phones is not None:
+        digest.update(phones.tobytes())
+    return digest.hexdigest()[:16]
@@ -0,0 +1,309 @@
+"""Modo por lotes: prepara una campaña desde la línea de comandos, sin Streamlit.
+
+Ejemplo:
+    python -m autowhatsend contactos.xlsx --column NUMERO --template "Hola {NOMBRE}" --format html -o envio.html
+
+Con --workers N la validación y la exportación se reparten en N procesos.
+Con --format shards la campaña se reparte en lotes para varios operadores.
+Con --report se guarda además el reporte de cada fila (Excel, CSV o Parquet).
+Con --url-overflow se quitan o recortan los mensajes cuya URL pasa de --url-budget.
+Con --stats se imprime el tiempo y la memoria de cada etapa.
+"""
+import argparse
+import itertools
+import os
+import sys
+from pathlib import Path
+
+from .campaign import CAMPAIGN_CHUNK_ROWS, Campaign, campaign_storage_id
+from .export import write_html_export
+from .ingest import SUPPORTED_EXTENSIONS, hash_file, read_contacts
+from .instrumentation import StageRecorder, stage_memory_bytes
+from .journal import DEFAULT_JOURNAL_PATH, SendJournal
+from .messages import (
+    URL_LENGTH_BUDGET,
+    URL_OVERFLOW_ACTIONS,
+    WHATSAPP_SEND_URL,
+    template_placeholders,
+    url_length_summary,
+)
+from .parallel import (
+    PARALLEL_CHUNK_ROWS,
+    create_process_pool,
+    iter_records_parallel,
+    map_campaign,
+    validate_phone_numbers_parallel,
+)
+from .phones import DEFAULT_COUNTRY, NUMBERING_PLANS
+from .report import REPORT_CHUNK_ROWS, REPORT_FORMATS, iter_report_chunks, write_table
+from .sender import PACING_MODES, build_pacing, describe_pacing
+from .shards import parse_shard_weights, write_shard_bundle
+from .suppression import DEDUPE_OPTIONS, SuppressionStore, find_duplicates, phones_as_int, sorted_membership
+
+OUTPUT_FORMATS = ['urls', 'html', 'excel', 'shards']
+
+# Columnas que se leen aunque la plantilla no las use: forman el texto de cada contacto
+DISPLAY_COLUMNS = ['NOMBRE', 'EMPRESA']
+
+# Nombre que usa --suppress para los números ya abiertos o confirmados en el diario
+CONTACTED_LIST = 'contactados'
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='autowhatsend',
+        description="Prepara una campaña de WhatsApp (URLs, HTML o Excel) a partir de un archivo de contactos."
+    )
+    parser.add_argument('input', help=f"Archivo de contactos ({', '.join('.' + ext for ext in SUPPORTED_EXTENSIONS)})")
+    parser.add_argument('-c', '--column', required=True, help="Columna con los números de teléfono")
+    parser.add_argument('--country', choices=list(NUMBERING_PLANS), default=DEFAULT_COUNTRY,
+                        help=f"País de los números sin indicativo (por defecto: {DEFAULT_COUNTRY})")
+    template = parser.add_mutually_exclusive_group(required=True)
+    template.add_argument('-t', '--template', help="Mensaje con variables {COLUMNA}")
+    template.add_argument('--template-file', help="Archivo de texto (UTF-8) con el mensaje")
+    parser.add_argument('-f', '--format', choices=OUTPUT_FORMATS, default='urls', help="Formato de salida (por defecto: urls)")
+    parser.add_argument('-o', '--output', help="Archivo de salida (por defecto: salida estándar para urls)")
+    parser.add_argument('--send-url', metavar='URL',
+                        help=f"Dirección de envío de las URLs (por defecto: {WHATSAPP_SEND_URL}, "
+                             "o AUTOWHATSEND_SEND_URL)")
+    parser.add_argument('--url-budget', type=int, default=URL_LENGTH_BUDGET, metavar='CARACTERES',
+                        help=f"Largo máximo de cada URL (por defecto: {URL_LENGTH_BUDGET}, o AUTOWHATSEND_URL_BUDGET)")
+    parser.add_argument('--url-overflow', choices=list(URL_OVERFLOW_ACTIONS), default='warn',
+                        help="Qué hacer con las URLs más largas que --url-budget: avisar (warn), "
+                             "quitar el contacto (exclude) o recortar el mensaje (truncate)")
+    filters = parser.add_argument_group("duplicados y supresión")
+    filters.add_argument('--dedupe', choices=list(DEDUPE_OPTIONS), default='first',
+                         help="Fila que se conserva cuando un número se repite (por defecto: first)")
+    filters.add_argument('--suppress', action='append', default=[], metavar='LISTA',
+                         help=f"No enviar a los números de esta lista de supresión ('{CONTACTED_LIST}': "
+                              "ya contactados en campañas anteriores); se puede repetir")
+    filters.add_argument('--journal', default=os.environ.get('AUTOWHATSEND_JOURNAL_PATH', DEFAULT_JOURNAL_PATH),
+                         help="Archivo SQLite del diario de envíos y las listas de supresión")
+    parallel = parser.add_argument_group("preparación en paralelo")
+    parallel.add_argument('--workers', type=int, default=0,
+                          help="Procesos para validar y generar mensajes/URLs (0 o 1: sin paralelismo)")
+    parallel.add_argument('--chunk-rows', type=int, default=PARALLEL_CHUNK_ROWS,
+                          help=f"Filas por bloque enviado a cada proceso (por defecto: {PARALLEL_CHUNK_ROWS})")
+    shards = parser.add_argument_group("lotes por operador (--format shards, ZIP)")
+    shards.add_argument('--shards', type=int, default=2, help="Cantidad de lotes iguales (por defecto: 2)")
+    shards.add_argument('--shard-weights', type=parse_shard_weights, metavar='PESOS',
+                        help="Capacidad relativa de cada operador, p. ej. 2,1,1 (reemplaza a --shards)")
+    shards.add_argument('--operators', metavar='NOMBRES', help="Nombres de los operadores separados por comas")
+    report = parser.add_argument_group("reporte")
+    report.add_argument('--report', metavar='ARCHIVO',
+                        help="Guarda una fila por contacto (estado, motivo, envío y URL); "
+                             f"el formato sale de la extensión ({', '.join('.' + fmt for fmt in REPORT_FORMATS)})")
+    stats = parser.add_argument_group("instrumentación")
+    stats.add_argument('--stats', action='store_true',
+                       help="Imprime en stderr el tiempo, las filas por segundo y la memoria de cada etapa")
+    stats.add_argument('--stage-log', metavar='ARCHIVO',
+                       help="Agrega cada etapa medida como una línea JSON a este archivo")
+    pacing = parser.add_argument_group("ritmo de envío (HTML)")
+    pacing.add_argument('--pacing', choices=list(PACING_MODES), default='fixed')
+    pacing.add_argument('--delay', type=float, default=15, help="Segundos entre mensajes")
+    pacing.add_argument('--jitter', type=float, default=0, help="Variación aleatoria (± segundos) para --pacing jitter")
+    pacing.add_argument('--rate', type=int, default=4, help="Mensajes por ventana para --pacing token_bucket")
+    pacing.add_argument('--window', type=float, default=60, help="Ventana en segundos para --pacing token_bucket")
+    return parser
+
+def suppressed_numbers(validation, journal_path, list_names):
+    """Filas válidas cuyo número está en alguna de las listas de supresión"""
+    phones = phones_as_int(validation)
+    store = SuppressionStore(journal_path)
+    try:
+        suppressed = store.contains(phones, [name for name in list_names if name != CONTACTED_LIST])
+    finally:
+        store.close()
+    if CONTACTED_LIST in list_names:
+        journal = SendJournal(journal_path)
+        try:
+            suppressed |= sorted_membership(phones, journal.contacted_phones())
+        finally:
+            journal.close()
+    return suppressed & validation['valid'].to_numpy()
+
+def send_states(journal_path, campaign_id):
+    """Estado de envío de cada posición de la campaña según el diario (None si no hay diario)"""
+    if not os.path.exists(journal_path):
+        return None
+    journal = SendJournal(journal_path)
+    try:
+        return journal.contact_states(campaign_id)
+    finally:
+        journal.close()
+
+def load_campaign(input_path, number_column, message_template, keep='first', suppress=(),
+                  journal_path=DEFAULT_JOURNAL_PATH, default_country=DEFAULT_COUNTRY,
+                  executor=None, chunk_rows=PARALLEL_CHUNK_ROWS, recorder=None):
+    """Lee solo las columnas necesarias, valida los números y arma la campaña sin duplicados ni suprimidos"""
+    recorder = recorder or StageRecorder()
+    usecols = {number_column, *DISPLAY_COLUMNS, *template_placeholders(message_template)}
+    with recorder.stage('read_contacts') as stage, open(input_path, 'rb') as file_obj:
+        df = read_contacts(file_obj, Path(input_path).name, usecols=usecols)
+        stage['rows'] = len(df)
+    if number_column not in df.columns:
+        raise KeyError(number_column)
+    with recorder.stage('validate', rows=len(df)):
+        validation = validate_phone_numbers_parallel(df[number_column], default_country, executor, chunk_rows)
+    with recorder.stage('dedupe_suppression', rows=len(df)):
+        duplicates = find_duplicates(validation, keep).to_numpy()
+        suppressed = suppressed_numbers(validation, journal_path, suppress) if suppress else duplicates & False
+        suppressed &= ~duplicates
+    campaign = Campaign.from_validation(df, validation, exclude=duplicates | suppressed)
+    removed = {'duplicates': duplicates, 'suppressed': suppressed}
+    return campaign.with_template(message_template), validation, removed
+
+def apply_url_budget(campaign, budget, action='warn', recorder=None):
+    """Revisa el largo de todas las URLs antes de exportar y quita o recorta las que pasan de budget.
+
+    Al recortar, se quitan las que no caben ni recortadas. Devuelve la campaña y las filas
+    del archivo que se quitaron (booleano por fila, o None).
+    """
+    import numpy as np
+    recorder = recorder or StageRecorder()
+    with recorder.stage('url_lengths', rows=len(campaign)):
+        lengths = campaign.url_lengths()
+    summary = url_length_summary(lengths, budget)
+    print(f"📏 URLs: mediana {summary['p50']}, p95 {summary['p95']}, máximo {summary['max']} caracteres",
+          file=sys.stderr)
+    if not summary['over']:
+        return campaign, None
+    over = lengths > budget
+    print(f"⚠️ {summary['over']} URLs pasan de {budget} caracteres "
+          f"({URL_OVERFLOW_ACTIONS[action].lower()}); primeras filas: "
+          f"{', '.join(str(position + 1) for position in campaign.positions[over][:10])}", file=sys.stderr)
+    if action == 'truncate':
+        # Los que no caben ni con un carácter del mensaje se quitan: no se envían mensajes vacíos
+        over = campaign.untruncatable(budget, lengths)
+        if not over.any():
+            return campaign.with_url_budget(budget), None
+        print(f"⚠️ {over.sum()} URLs no caben ni recortando el mensaje; se quitan de la campaña", file=sys.stderr)
+    if action in ('exclude', 'truncate'):
+        oversized = np.zeros(len(campaign.df), dtype=bool)
+        oversized[campaign.positions[over]] = True
+        remaining = campaign.without(over)
+        return (remaining.with_url_budget(budget) if action == 'truncate' else remaining), oversized
+    return campaign, None
+
+def write_urls(campaign, output, executor=None, chunk_rows=CAMPAIGN_CHUNK_ROWS, workers=None):
+    for urls in map_campaign(campaign, 'urls', executor, chunk_rows, workers):
+        output.write('\n'.join(urls))
+        output.write('\n')
+
+def write_excel(records, path, chunk_rows=REPORT_CHUNK_ROWS):
+    """Escribe los contactos por bloques (xlsxwriter en modo constant_memory)"""
+    import pandas as pd
+    columns = ['numero', 'url', 'mensaje', 'display_info']
+    records = iter(records)
+    batches = iter(lambda: list(itertools.islice(records, chunk_rows)), [])
+    write_table(path, (pd.DataFrame(batch, columns=columns) for batch in batches), 'xlsx', sheet_name='Datos')
+
+def report_format(path):
+    return Path(path).suffix.lstrip('.').lower()
+
+def print_stages(records, file=sys.stderr):
+    """Resumen de las etapas medidas, en el orden en que corrieron"""
+    for record in reversed(records):
+        memory = stage_memory_bytes(record)
+        speed = f"{record['rows_per_second']:,.0f} filas/s" if record['rows_per_second'] else "-"
+        memory_text = f"{memory / 2**20:>8.1f} MB" if memory is not None else f"{'-':>11}"
+        print(f"📊 {record['stage']:<20} {record['rows'] or 0:>10,} filas {record['seconds']:>9.3f} s "
+              f"{speed:>18} {memory_text}", file=file)
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.format != 'urls' and not args.output:
+        parser.error(f"--output es obligatorio para --format {args.format}")
+    if args.send_url and not args.send_url.startswith(('http://', 'https://')):
+        parser.error("--send-url debe empezar con http:// o https://")
+    if args.url_budget < 1:
+        parser.error("--url-budget debe ser positivo")
+    if args.report and report_format(args.report) not in REPORT_FORMATS:
+        parser.error(f"--report debe terminar en {', '.join('.' + fmt for fmt in REPORT_FORMATS)}")
+    if args.shard_weights is None:
+        if args.shards < 1:
+            parser.error("--shards debe ser al menos 1")
+        args.shard_weights = [1] * args.shards
+    if args.operators is not None:
+        args.operators = [name.strip() for name in args.operators.split(',')]
+        if len(args.operators) != len(args.shard_weights):
+            parser.error("--operators debe tener un nombre por lote")
+
+    if args.template is not None:
+        message_template = args.template
+    else:
+        message_template = Path(args.template_file).read_text(encoding='utf-8')
+
+    executor = create_process_pool(args.workers) if args.workers > 1 else None
+    try:
+        return run(parser, args, message_template, executor)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+def run(parser, args, message_template, executor=None):
+    recorder = StageRecorder(args.stage_log)
+    try:
+        campaign, validation, removed = load_campaign(
+            args.input, args.column, message_template, args.dedupe, args.suppress, args.journal, args.country,
+            executor, args.chunk_rows, recorder
+        )
+    except KeyError:
+        parser.error(f"la columna {args.column!r} no existe en {args.input}")
+    except (OSError, ValueError) as e:
+        parser.error(f"no se pudo leer {args.input}: {e}")
+    if args.send_url:
+        campaign = campaign.with_send_url(args.send_url)
+    campaign, removed['oversized'] = apply_url_budget(campaign, args.url_budget, args.url_overflow, recorder)
+    records = iter_records_parallel(campaign, executor, args.chunk_rows, args.workers)
+
+    duplicate_count, suppressed_count = int(removed['duplicates'].sum()), int(removed['suppressed'].sum())
+    oversized_count = int(removed['oversized'].sum()) if removed['oversized'] is not None else 0
+    invalid_count = len(validation) - len(campaign) - duplicate_count - suppressed_count - oversized_count
+    print(f"✅ {len(campaign)} números válidos, ❌ {invalid_count} inválidos, "
+          f"🔁 {duplicate_count} duplicados, 🚫 {suppressed_count} suprimidos"
+          + (f", 📏 {oversized_count} con la URL muy larga" if oversized_count else ""), file=sys.stderr)
+    campaign_id = None
+    if args.format in ('html', 'shards') or args.report:
+        campaign_id = campaign_storage_id(hash_file(args.input), args.column, message_template, campaign.phones)
+
+    with recorder.stage(f'export_{args.format}', rows=len(campaign)):
+        if args.format == 'urls':
+            if args.output:
+                with open(args.output, 'w', encoding='utf-8') as output:
+                    write_urls(campaign, output, executor, args.chunk_rows, args.workers)
+            else:
+                write_urls(campaign, sys.stdout, executor, args.chunk_rows, args.workers)
+        elif args.format in ('html', 'shards'):
+            pacing = build_pacing(args.pacing, delay=args.delay, jitter=args.jitter, rate=args.rate, window=args.window)
+            with open(args.output, 'wb') as output:
+                if args.format == 'html':
+                    write_html_export(records, output, pacing, campaign_id)
+                else:
+                    manifest = write_shard_bundle(
+                        campaign, output, args.shard_weights, pacing, campaign_id, args.operators,
+                        records=lambda part: iter_records_parallel(part, executor, args.chunk_rows, args.workers)
+                    )
+            print(f"⏰ Ritmo de envío: {describe_pacing(pacing)}", file=sys.stderr)
+            if args.format == 'shards':
+                for shard in manifest:
+                    print(f"👤 {shard['operador']}: {shard['contactos']} contactos, "
+                          f"fin estimado {shard['fin_estimado']} ({shard['html']})", file=sys.stderr)
+        else:
+            write_excel(records, args.output)
+
+    if args.report:
+        with recorder.stage('report', rows=len(validation)):
+            # Incluye el estado de envío si esta misma campaña ya se envió (p. ej. desde la app)
+            chunks = iter_report_chunks(campaign.df, args.column, validation, campaign, removed['duplicates'],
+                                        removed['suppressed'], send_states(args.journal, campaign_id),
+                                        oversized=removed['oversized'])
+            write_table(args.report, chunks, report_format(args.report))
+        print(f"📊 Reporte generado: {args.report}", file=sys.stderr)
+
+    if args.stats:
+        print_stages(recorder.recent())
+
+    if args.output:
+        print(f"📥 Archivo generado: {args.output}", file=sys.stderr)
+    return 0
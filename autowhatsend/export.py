@@ -0,0 +1,143 @@
+"""Exportación de la campaña: HTML de envío automático y Excel"""
+import tempfile
+from io import BytesIO
+
+from .sender import DEFAULT_PACING, SEND_PANEL_CSS, SEND_PANEL_HTML, _iter_send_page
+
+HTML_EXPORT_HEAD = """
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="utf-8">
+        <title>AutoWhatsApp - Envío Automático</title>
+        <style>
+            body { 
+                font-family: Arial, sans-serif; 
+                margin: 40px; 
+                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+                color: white;
+            }
+            .container {
+                max-width: 800px;
+                margin: 0 auto;
+                background: rgba(255, 255, 255, 0.1);
+                padding: 30px;
+                border-radius: 15px;
+                backdrop-filter: blur(10px);
+            }
+            .whatsapp-link { 
+                display: inline-block; 
+                background-color: #25D366; 
+                color: white; 
+                padding: 15px 25px; 
+                margin: 15px; 
+                text-decoration: none; 
+                border-radius: 30px; 
+                font-weight: bold; 
+                font-size: 16px;
+                transition: all 0.3s; 
+                box-shadow: 0 4px 15px rgba(37, 211, 102, 0.3);
+            }
+            .whatsapp-link:hover { 
+                background-color: #128C7E; 
+                transform: translateY(-2px);
+                box-shadow: 0 6px 20px rgba(37, 211, 102, 0.4);
+            }
+            .contact-info { 
+                background: rgba(255, 255, 255, 0.15); 
+                padding: 20px; 
+                margin: 20px 0; 
+                border-radius: 12px; 
+                border-left: 5px solid #25D366; 
+            }
+            .instructions {
+                background: rgba(255, 255, 255, 0.1);
+                padding: 20px;
+                border-radius: 10px;
+                margin: 20px 0;
+            }
+            .timer {
+                font-size: 18px;
+                font-weight: bold;
+                color: #25D366;
+                margin: 10px 0;
+            }
+            h1 {
+                text-align: center;
+                font-size: 2.5em;
+                margin-bottom: 30px;
+                text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
+            }
+""" + SEND_PANEL_CSS + """
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <h1>📱 AutoWhatsApp</h1>
+            
+            <div class="instructions">
+                <h3>🚀 Instrucciones para Envío Automático:</h3>
+                <ol>
+                    <li>Haz clic en el botón "Iniciar Envío Automático"</li>
+                    <li>Se abrirá WhatsApp Web en nueva pestaña según el ritmo configurado</li>
+                    <li>El mensaje estará pre-escrito</li>
+                    <li>Solo debes hacer clic en <strong>ENVIAR</strong> manualmente</li>
+                    <li>El timer mostrará el progreso; puedes pausar, reanudar o saltar contactos</li>
+                    <li>Si cierras el navegador, al volver a abrir este archivo continúa desde el último contacto</li>
+                </ol>
+                <p><strong>💡 Tip:</strong> Mantén WhatsApp Web abierto y logueado</p>
+            </div>
+            
+            <div id="progress" style="text-align: center; margin: 30px 0;">
+""" + SEND_PANEL_HTML + """
+            </div>
+        </div>
+        
+"""
+
+HTML_EXPORT_TAIL = """
+    </body>
+    </html>
+    """
+
+def iter_html_export(urls_data, pacing=None, campaign_id=None):
+    """Genera por partes el HTML de envío automático.
+
+    urls_data puede ser cualquier iterable de contactos (p. ej. Campaign.iter_records()).
+    """
+    config = {'pacing': pacing or DEFAULT_PACING, 'campaignId': campaign_id, 'autoStart': False}
+    contacts = ([data['display_info'], data['url']] for data in urls_data)
+    yield from _iter_send_page(HTML_EXPORT_HEAD, contacts, config, HTML_EXPORT_TAIL)
+
+def create_html_with_auto_click(urls_data, pacing=None, campaign_id=None):
+    """Crea HTML con auto-click para enviar mensajes"""
+    return ''.join(iter_html_export(urls_data, pacing, campaign_id))
+
+def write_html_export(urls_data, output, pacing=None, campaign_id=None):
+    """Escribe el HTML por partes en un archivo binario abierto"""
+    for chunk in iter_html_export(urls_data, pacing, campaign_id):
+        output.write(chunk.encode())
+
+def export_html_file(campaign, pacing=None, campaign_id=None, records=None):
+    """Escribe el HTML de la campaña en un archivo temporal y lo devuelve listo para leer.
+
+    records reemplaza a campaign.iter_records() (p. ej. iter_records_parallel).
+    """
+    output = tempfile.TemporaryFile()
+    write_html_export(campaign.iter_records() if records is None else records, output, pacing, campaign_id)
+    output.seek(0)
+    return output
+
+def export_html_path(campaign, pacing=None, campaign_id=None, records=None):
+    """Como export_html_file, pero en un archivo con nombre (para leerlo desde otro hilo o sesión)"""
+    with tempfile.NamedTemporaryFile(prefix='autowhatsend_', suffix='.html', delete=False) as output:
+        write_html_export(campaign.iter_records() if records is None else records, output, pacing, campaign_id)
+    return output.name
+
+def create_excel_download(data, filename):
+    """Crea un archivo Excel para descarga"""
+    import pandas as pd
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+        data.to_excel(writer, index=False, sheet_name='Datos')
+    return output.getvalue()
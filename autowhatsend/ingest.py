@@ -0,0 +1,97 @@
+"""Lectura por bloques de archivos de contactos (.xlsx, .csv, .parquet)"""
+import hashlib
+
+SUPPORTED_EXTENSIONS = ['xlsx', 'csv', 'parquet']
+INGEST_CHUNK_ROWS = 50000
+
+def _excel_header(values):
+    """Nombres de columna como los genera pandas (Unnamed: i, duplicados con sufijo .n)"""
+    header, seen = [], {}
+    for i, value in enumerate(values):
+        name = f"Unnamed: {i}" if value is None else value
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        header.append(name)
+    return header
+
+def _iter_excel_chunks(file_obj, usecols, chunk_rows):
+    """Recorre la primera hoja en modo read-only de openpyxl, sin cargar el libro completo"""
+    import pandas as pd
+    from openpyxl import load_workbook
+    workbook = load_workbook(file_obj, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = _excel_header(next(rows, ()))
+        positions = [i for i, name in enumerate(header) if usecols is None or name in usecols]
+        columns = [header[i] for i in positions]
+        chunk = []
+        # Como pd.read_excel: las filas vacías intermedias se conservan y solo se descartan las del final
+        blank_rows = 0
+        for row in rows:
+            if all(value is None for value in row):
+                blank_rows += 1
+                continue
+            for values in [[None] * len(positions)] * blank_rows + [[row[i] if i < len(row) else None for i in positions]]:
+                chunk.append(values)
+                if len(chunk) >= chunk_rows:
+                    yield pd.DataFrame(chunk, columns=columns)
+                    chunk = []
+            blank_rows = 0
+        if chunk or not columns:
+            yield pd.DataFrame(chunk, columns=columns)
+    finally:
+        workbook.close()
+
+def iter_contact_chunks(file_obj, file_name, usecols=None, chunk_rows=INGEST_CHUNK_ROWS):
+    """Lee el archivo (.xlsx, .csv o .parquet) por bloques de filas.
+
+    Con usecols solo se leen esas columnas (p. ej. la de números y las que usa la
+    plantilla); los nombres que no existan en el archivo se ignoran.
+    """
+    import pandas as pd
+    extension = file_name.rsplit('.', 1)[-1].lower()
+    if extension == 'csv':
+        # Todo como texto: evita que una columna de números con vacíos se lea como float
+        wanted = None if usecols is None else (lambda name: name in usecols)
+        yield from pd.read_csv(file_obj, usecols=wanted, dtype=str, chunksize=chunk_rows)
+    elif extension == 'parquet':
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(file_obj)
+        columns = None
+        if usecols is not None:
+            columns = [name for name in parquet_file.schema_arrow.names if name in usecols]
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+    elif extension == 'xlsx':
+        yield from _iter_excel_chunks(file_obj, usecols, chunk_rows)
+    else:
+        raise ValueError(f"Formato no soportado: .{extension}")
+
+def read_contacts(file_obj, file_name, usecols=None, chunk_rows=INGEST_CHUNK_ROWS, progress=None):
+    """Lee el archivo completo por bloques; progress(filas_leidas) se llama tras cada bloque"""
+    import pandas as pd
+    chunks = []
+    rows_read = 0
+    for chunk in iter_contact_chunks(file_obj, file_name, usecols, chunk_rows):
+        chunks.append(chunk)
+        rows_read += len(chunk)
+        if progress is not None:
+            progress(rows_read)
+    if not chunks:
+        return pd.DataFrame()
+    return pd.concat(chunks, ignore_index=True)
+
+def hash_file_bytes(file_bytes):
+    """Hash del contenido del archivo, usado como clave de caché"""
+    return hashlib.sha256(file_bytes).hexdigest()
+
+def hash_file(path, block_size=1 << 20):
+    """Hash del contenido de un archivo en disco, leído por bloques"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file_obj:
+        for block in iter(lambda: file_obj.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
@@ -0,0 +1,162 @@
+"""Instrumentación por etapa: tiempo, filas, memoria y perfil opcional con cProfile.
+
+Cada etapa medida queda como un diccionario en memoria (las últimas
+STAGE_HISTORY) y, si hay log_path, como una línea JSON en ese archivo.
+
+La memoria se mide de dos formas:
+- peak_rss_growth_bytes: pico de memoria residente del proceso durante la etapa
+  menos la que había al empezar, muestreada en un hilo cada RSS_SAMPLE_SECONDS
+  (rss_delta_bytes es lo que quedó al terminar). Lee /proc/self/statm, así que
+  solo está en Linux; en otros sistemas queda en None.
+- peak_traced_bytes: pico de memoria de Python según tracemalloc, solo si está
+  activo (trace_memory=True). Es mucho más preciso pero hace el pipeline varias
+  veces más lento, así que es para diagnosticar, no para dejarlo encendido.
+Ambas son del proceso completo: con etapas simultáneas en varios hilos son aproximadas.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+STAGE_HISTORY = 200
+
+PROFILE_TOP_FUNCTIONS = 25
+
+RSS_SAMPLE_SECONDS = 0.02
+
+_STATM_PATH = Path('/proc/self/statm')
+
+def _current_rss_bytes():
+    """Memoria residente actual del proceso, o None si no hay /proc (macOS, Windows)"""
+    try:
+        return int(_STATM_PATH.read_text().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+class _RssSampler:
+    """Muestrea la memoria residente en un hilo mientras dura la etapa y guarda el máximo.
+
+    ru_maxrss no sirve por etapa: es el máximo histórico del proceso y no baja,
+    así que después de una etapa grande las siguientes mostrarían 0.
+    """
+
+    def __init__(self, interval=RSS_SAMPLE_SECONDS):
+        self.start = self.peak = _current_rss_bytes()
+        self._stop = threading.Event()
+        self._thread = None
+        if self.start is not None:
+            self._thread = threading.Thread(target=self._run, args=(interval,), name='autowhatsend-rss', daemon=True)
+            self._thread.start()
+
+    def _run(self, interval):
+        while not self._stop.wait(interval):
+            self._sample()
+
+    def _sample(self):
+        current = _current_rss_bytes()
+        if current is not None and current > self.peak:
+            self.peak = current
+        return current
+
+    def stop(self):
+        """Detiene el muestreo; devuelve (pico - inicio, fin - inicio) en bytes, o (None, None)"""
+        if self._thread is None:
+            return None, None
+        self._stop.set()
+        self._thread.join()
+        end = self._sample()
+        return self.peak - self.start, end - self.start
+
+def stage_memory_bytes(record):
+    """Pico de memoria de la etapa: tracemalloc si estaba activo, si no la memoria residente (o None)"""
+    if record['peak_traced_bytes'] is not None:
+        return record['peak_traced_bytes']
+    return record['peak_rss_growth_bytes']
+
+class StageRecorder:
+    """Registro de etapas compartido por todas las sesiones (y sus hilos de trabajo)"""
+
+    def __init__(self, log_path=None, history=STAGE_HISTORY, trace_memory=False, profile_dir=None):
+        self.log_path = Path(log_path) if log_path else None
+        self.profile_dir = Path(profile_dir) if profile_dir else None
+        self.records = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._profile_armed = False
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def profile_next(self):
+        """Perfila con cProfile la próxima etapa que empiece, en cualquier hilo"""
+        with self._lock:
+            self._profile_armed = True
+
+    @property
+    def profile_armed(self):
+        return self._profile_armed
+
+    @contextmanager
+    def stage(self, name, rows=None, context=None):
+        """Mide el bloque. Devuelve el registro: dentro se puede completar 'rows' cuando se conoce"""
+        record = {'stage': name, 'context': context, 'rows': rows, 'started_at': time.time(), 'error': None}
+        with self._lock:
+            profiler = cProfile.Profile() if self._profile_armed else None
+            self._profile_armed = False
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            traced_before = tracemalloc.get_traced_memory()[0]
+        rss = _RssSampler()
+        if profiler is not None:
+            profiler.enable()
+        started = time.perf_counter()
+        try:
+            yield record
+        except BaseException as e:
+            record['error'] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            seconds = time.perf_counter() - started
+            if profiler is not None:
+                profiler.disable()
+            rss_growth, rss_delta = rss.stop()
+            record['seconds'] = round(seconds, 6)
+            record['rows_per_second'] = round(record['rows'] / seconds, 1) if record['rows'] and seconds else None
+            record['peak_rss_growth_bytes'] = rss_growth
+            record['rss_delta_bytes'] = rss_delta
+            record['peak_traced_bytes'] = tracemalloc.get_traced_memory()[1] - traced_before if tracing else None
+            if profiler is not None:
+                record['profile_path'], record['profile'] = self._save_profile(profiler, record)
+            self._add(record)
+
+    def _save_profile(self, profiler, record):
+        """Guarda el perfil (.prof, para snakeviz o pstats) y devuelve su ruta y un resumen en texto"""
+        path = None
+        if self.profile_dir is not None:
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+            path = self.profile_dir / f"{record['stage']}_{int(record['started_at'])}.prof"
+            profiler.dump_stats(path)
+            path = str(path)
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(PROFILE_TOP_FUNCTIONS)
+        return path, summary.getvalue()
+
+    def _add(self, record):
+        with self._lock:
+            self.records.append(record)
+            if self.log_path is not None:
+                line = {key: value for key, value in record.items() if key != 'profile'}
+                with open(self.log_path, 'a', encoding='utf-8') as log:
+                    log.write(json.dumps(line, ensure_ascii=False) + '\n')
+
+    def recent(self, context=None):
+        """Registros del más reciente al más antiguo; con context, solo los de esa sesión"""
+        with self._lock:
+            records = list(self.records)
+        return [record for record in reversed(records) if context is None or record['context'] == context]
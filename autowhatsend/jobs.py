@@ -0,0 +1,251 @@
+"""Trabajos en segundo plano para preparar campañas sin bloquear la interfaz.
+
+Cada trabajo corre en un hilo del JobRunner y recibe una función progress(done,
+total, message) para informar su avance. Si se pidió cancelarlo, la siguiente
+llamada a progress lanza JobCancelled. Los trabajos con la misma clave se
+comparten (dos sesiones que validan el mismo archivo usan un solo trabajo).
+
+Cada trabajo puede tener dueños (p. ej. las sesiones que muestran su resultado):
+mientras tenga alguno no se descarta, y su archivo no se borra. Los trabajos
+terminados sin dueño se conservan hasta max_finished por tipo (kind), descartando
+el más antiguo; un dueño que nunca lo suelta (una sesión cerrada) deja de contar
+después de owner_ttl segundos.
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+JOB_STATES = ('pending', 'running', 'done', 'failed', 'cancelled')
+
+JOB_WORKERS = 4
+
+JOB_MAX_FINISHED = 16
+
+# Segundos tras los que un trabajo terminado se puede descartar aunque tenga dueños
+JOB_OWNER_TTL = 6 * 3600
+
+# Cada cuántos elementos iter_with_progress informa el avance
+JOB_PROGRESS_EVERY = 1000
+
+class JobCancelled(Exception):
+    """Se lanza dentro del trabajo cuando se pidió cancelarlo"""
+
+class Job:
+    """Estado de un trabajo: avance, resultado o error"""
+    __slots__ = ('id', 'key', 'kind', 'owners', 'state', 'done', 'total', 'message', 'result', 'error',
+                 'created_at', 'finished_at', 'cleanup', 'future', 'cancel_requested')
+
+    def __init__(self, job_id, key=None, cleanup=None, kind=None):
+        self.id = job_id
+        self.key = key
+        self.kind = kind
+        self.owners = set()
+        self.state = 'pending'
+        self.done = 0
+        self.total = None
+        self.message = ''
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.cleanup = cleanup
+        self.future = None
+        self.cancel_requested = False
+
+    @property
+    def finished(self):
+        return self.state in ('done', 'failed', 'cancelled')
+
+    @property
+    def fraction(self):
+        """Avance entre 0 y 1 (0 si todavía no se conoce el total)"""
+        if self.state == 'done':
+            return 1.0
+        return min(self.done / self.total, 1.0) if self.total else 0.0
+
+    def report(self, done, total=None, message=None):
+        """Actualiza el avance; lanza JobCancelled si se pidió cancelar"""
+        if self.cancel_requested:
+            raise JobCancelled(self.id)
+        self.done = done
+        if total is not None:
+            self.total = total
+        if message is not None:
+            self.message = message
+
+class JobRunner:
+    """Ejecuta trabajos en un pool de hilos compartido por todas las sesiones"""
+
+    def __init__(self, max_workers=JOB_WORKERS, max_finished=JOB_MAX_FINISHED, owner_ttl=JOB_OWNER_TTL):
+        from concurrent.futures import ThreadPoolExecutor
+        self.max_finished = max_finished
+        self.owner_ttl = owner_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='autowhatsend-job')
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, function, *args, key=None, cleanup=None, kind=None, owner=None, **kwargs):
+        """Inicia function(*args, progress=job.report, **kwargs) y devuelve el ID del trabajo.
+
+        Con key, si ya hay un trabajo con esa clave pendiente o en curso (sin
+        pedido de cancelación) o terminado con éxito, devuelve su ID en lugar de
+        iniciar otro. cleanup se llama con el resultado cuando el trabajo se
+        descarta. owner queda como dueño del trabajo hasta que llame a release
+        o cancel.
+        """
+        with self._lock:
+            if key is not None:
+                for job in self._jobs.values():
+                    if job.key == key and (job.state == 'done' or not job.finished and not job.cancel_requested):
+                        if owner is not None:
+                            job.owners.add(owner)
+                        return job.id
+            job = Job(uuid.uuid4().hex, key, cleanup, kind)
+            if owner is not None:
+                job.owners.add(owner)
+            self._jobs[job.id] = job
+            job.future = self._executor.submit(self._run, job, function, args, kwargs)
+        return job.id
+
+    def _run(self, job, function, args, kwargs):
+        state = 'cancelled'
+        if not job.cancel_requested:
+            job.state = 'running'
+            try:
+                job.result = function(*args, progress=job.report, **kwargs)
+                state = 'done'
+            except JobCancelled:
+                state = 'cancelled'
+            except Exception as e:
+                job.error = f"{type(e).__name__}: {e}"
+                state = 'failed'
+        # finished_at antes que el estado: _prune ordena por él los trabajos terminados
+        job.finished_at = time.time()
+        job.state = state
+        self._prune()
+
+    def get(self, job_id):
+        """Trabajo con ese ID, o None si no existe o ya se descartó"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def wait(self, job_id, timeout=None):
+        """Espera a que el trabajo termine y lo devuelve (None si no existe)"""
+        job = self.get(job_id)
+        if job is not None and not job.future.cancelled():
+            job.future.result(timeout)
+        return job
+
+    def release(self, job_id, owner):
+        """owner deja de necesitar el trabajo; si no le quedan dueños puede descartarse"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return False
+            job.owners.discard(owner)
+        self._prune()
+        return True
+
+    def cancel(self, job_id, owner=None):
+        """Pide cancelar el trabajo; se detiene en su siguiente informe de avance.
+
+        Con owner, solo ese dueño deja el trabajo: se cancela cuando no le quedan
+        dueños, así otra sesión que pidió lo mismo lo sigue recibiendo.
+        Devuelve si se pidió cancelarlo.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return False
+            if owner is not None:
+                job.owners.discard(owner)
+                if job.owners:
+                    return False
+            job.cancel_requested = True
+        if job.future.cancel():
+            job.finished_at = time.time()
+            job.state = 'cancelled'
+        return True
+
+    def forget(self, job_id):
+        """Descarta un trabajo terminado y libera su resultado"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or not job.finished:
+                return False
+            del self._jobs[job_id]
+        self._discard(job)
+        return True
+
+    def _prune(self):
+        expired = time.time() - self.owner_ttl
+        with self._lock:
+            by_kind = {}
+            for job in self._jobs.values():
+                if job.finished and (not job.owners or job.finished_at < expired):
+                    by_kind.setdefault(job.kind, []).append(job)
+            discarded = []
+            for jobs in by_kind.values():
+                jobs.sort(key=lambda job: job.finished_at)
+                discarded += jobs[:max(len(jobs) - self.max_finished, 0)]
+            for job in discarded:
+                del self._jobs[job.id]
+        for job in discarded:
+            self._discard(job)
+
+    def _discard(self, job):
+        if job.cleanup is not None and job.state == 'done':
+            job.cleanup(job.result)
+
+    def shutdown(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            self.cancel(job.id)
+        self._executor.shutdown(wait=True)
+
+class ResultCache:
+    """Resultados ya calculados por clave; conserva los max_entries usados más recientemente.
+
+    Complementa al JobRunner: sus trabajos terminados sin dueño se descartan al
+    llegar a max_finished por tipo, y aquí un resultado caro (p. ej. la
+    validación de cada columna) sigue disponible aunque su trabajo ya no exista.
+    """
+
+    def __init__(self, max_entries=JOB_MAX_FINISHED):
+        self.max_entries = max_entries
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._results:
+                return default
+            self._results.move_to_end(key)
+            return self._results[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._results[key] = value
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._results
+
+    def __len__(self):
+        with self._lock:
+            return len(self._results)
+
+def iter_with_progress(items, total, progress=None, every=JOB_PROGRESS_EVERY):
+    """Recorre items llamando a progress(cantidad, total) cada `every` elementos"""
+    count = 0
+    for count, item in enumerate(items, 1):
+        if progress is not None and count % every == 0:
+            progress(count, total)
+        yield item
+    if progress is not None:
+        progress(count, total)
@@ -0,0 +1,189 @@
+"""Diario de envíos persistente en SQLite.
+
+Cada campaña registra todas sus posiciones como 'queued'. Cada cambio de estado
+(opened, confirmed, failed, skipped) se agrega a `send_events`, que solo crece, y
+actualiza el estado actual en `contact_state`. Retomar una campaña es buscar la
+primera posición que sigue en 'queued', una consulta sobre el índice
+(campaign_id, state, position).
+"""
+import sqlite3
+import threading
+import time
+
+DEFAULT_JOURNAL_PATH = 'autowhatsend_journal.sqlite3'
+
+SEND_STATES = ('queued', 'opened', 'confirmed', 'failed', 'skipped')
+
+JOURNAL_BATCH_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS campaigns (
+    campaign_id TEXT PRIMARY KEY,
+    total INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS send_events (
+    id INTEGER PRIMARY KEY,
+    campaign_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS send_events_by_contact ON send_events (campaign_id, position);
+CREATE TABLE IF NOT EXISTS contact_state (
+    campaign_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    phone INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (campaign_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS contact_state_by_state ON contact_state (campaign_id, state, position);
+CREATE INDEX IF NOT EXISTS contact_state_by_phone ON contact_state (state, phone);
+"""
+
+CONTACTED_STATES = ('opened', 'confirmed')
+
+class SendJournal:
+    """Diario de envíos de todas las campañas, en un archivo SQLite local.
+
+    Las escrituras se acumulan en memoria y se guardan en una sola transacción
+    cada `batch_size` eventos o al llamar a flush(). Es seguro compartir una
+    instancia entre hilos (p. ej. varias sesiones de Streamlit).
+    """
+
+    def __init__(self, path, batch_size=JOURNAL_BATCH_SIZE):
+        self.path = str(path)
+        self.batch_size = batch_size
+        self._pending = []
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.executescript(_SCHEMA)
+
+    def register_campaign(self, campaign_id, phones):
+        """Agrega la campaña con todos sus contactos en 'queued'; no hace nada si ya existe"""
+        with self._lock, self._connection:
+            inserted = self._connection.execute(
+                'INSERT OR IGNORE INTO campaigns (campaign_id, total, created_at) VALUES (?, ?, ?)',
+                (campaign_id, len(phones), time.time())
+            ).rowcount
+            if not inserted:
+                return False
+            now = time.time()
+            self._connection.executemany(
+                'INSERT INTO contact_state (campaign_id, position, phone, state, updated_at) VALUES (?, ?, ?, ?, ?)',
+                ((campaign_id, position, int(phone), 'queued', now) for position, phone in enumerate(phones))
+            )
+        return True
+
+    def record(self, campaign_id, position, state, at=None):
+        """Agrega un cambio de estado; se guarda al completar el lote"""
+        if state not in SEND_STATES:
+            raise ValueError(f"Estado desconocido: {state}")
+        with self._lock:
+            self._pending.append((campaign_id, int(position), state, time.time() if at is None else at))
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+
+    def record_many(self, campaign_id, events):
+        """Agrega varios eventos (position, state, at) y los guarda de inmediato"""
+        for position, state, at in events:
+            self.record(campaign_id, position, state, at)
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        events, self._pending = self._pending, []
+        with self._connection:
+            self._connection.executemany(
+                'INSERT INTO send_events (campaign_id, position, state, at) VALUES (?, ?, ?, ?)',
+                events
+            )
+            self._connection.executemany(
+                'UPDATE contact_state SET state = ?, updated_at = ? WHERE campaign_id = ? AND position = ?',
+                ((state, at, campaign_id, position) for campaign_id, position, state, at in events)
+            )
+
+    def resume_position(self, campaign_id):
+        """Primera posición que nunca se abrió ni se saltó (total si no queda ninguna)"""
+        self.flush()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT MIN(position) FROM contact_state WHERE campaign_id = ? AND state = 'queued'",
+                (campaign_id,)
+            ).fetchone()
+            if row[0] is not None:
+                return row[0]
+            total = self._connection.execute(
+                'SELECT total FROM campaigns WHERE campaign_id = ?', (campaign_id,)
+            ).fetchone()
+        return total[0] if total else 0
+
+    def state_counts(self, campaign_id):
+        """Cantidad de contactos en cada estado"""
+        self.flush()
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT state, COUNT(*) FROM contact_state WHERE campaign_id = ? GROUP BY state',
+                (campaign_id,)
+            ).fetchall()
+        counts = dict.fromkeys(SEND_STATES, 0)
+        counts.update(rows)
+        return counts
+
+    def positions_in_state(self, campaign_id, state):
+        """Posiciones de la campaña que están en un estado, en orden"""
+        self.flush()
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT position FROM contact_state WHERE campaign_id = ? AND state = ? ORDER BY position',
+                (campaign_id, state)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def contact_states(self, campaign_id):
+        """Estado actual de cada posición de la campaña, como arreglo (vacío si no está registrada)"""
+        import numpy as np
+        self.flush()
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT position, state FROM contact_state WHERE campaign_id = ?', (campaign_id,)
+            ).fetchall()
+        states = np.full(max((row[0] for row in rows), default=-1) + 1, '', dtype=object)
+        for position, state in rows:
+            states[position] = state
+        return states
+
+    def contacted_phones(self, exclude_campaign=None):
+        """Números abiertos o confirmados en cualquier campaña, como arreglo int64 ordenado"""
+        import numpy as np
+        self.flush()
+        placeholders = ', '.join('?' * len(CONTACTED_STATES))
+        with self._lock:
+            rows = self._connection.execute(
+                f'SELECT DISTINCT phone FROM contact_state WHERE state IN ({placeholders}) '
+                'AND campaign_id IS NOT ? ORDER BY phone',
+                (*CONTACTED_STATES, exclude_campaign)
+            ).fetchall()
+        return np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+
+    def history(self, campaign_id, position):
+        """Eventos de un contacto, del más antiguo al más reciente"""
+        self.flush()
+        with self._lock:
+            return self._connection.execute(
+                'SELECT state, at FROM send_events WHERE campaign_id = ? AND position = ? ORDER BY id',
+                (campaign_id, position)
+            ).fetchall()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,238 @@
+"""Plantillas de mensaje y URLs de WhatsApp Web"""
+import os
+import re
+import urllib.parse
+
+def generate_whatsapp_url(number, message, send_url=None):
+    """Genera URL de WhatsApp Web"""
+    encoded_message = urllib.parse.quote(message)
+    return f"{send_url or WHATSAPP_SEND_URL}?phone={number}&text={encoded_message}"
+
+# AUTOWHATSEND_SEND_URL reemplaza la dirección de envío, p. ej. por el servidor
+# de prueba de benchmarks/standin.py para medir el envío sin una cuenta real
+WHATSAPP_SEND_URL = os.environ.get('AUTOWHATSEND_SEND_URL', "https://web.whatsapp.com/send")
+
+def generate_whatsapp_urls(numbers, encoded_messages, send_url=None):
+    """Genera las URLs de WhatsApp Web de toda la campaña (mensajes ya codificados)"""
+    return f"{send_url or WHATSAPP_SEND_URL}?phone=" + numbers + "&text=" + encoded_messages
+
+def url_overhead(send_url=None):
+    """Caracteres de la URL que no son el número ni el mensaje"""
+    return len(f"{send_url or WHATSAPP_SEND_URL}?phone=&text=")
+
+# Largo máximo de URL que se considera seguro al abrirla: con más, el navegador o
+# WhatsApp Web pueden cortarla o no abrirla. Un mensaje con tildes y emojis ocupa
+# hasta 3 veces más una vez codificado.
+URL_LENGTH_BUDGET = int(os.environ.get('AUTOWHATSEND_URL_BUDGET', '2048'))
+
+URL_OVERFLOW_ACTIONS = {
+    'warn': 'Solo avisar',
+    'exclude': 'Quitar esos contactos de la campaña',
+    'truncate': 'Recortar el mensaje para que quepa',
+}
+
+TRUNCATION_MARK = "…"
+
+def truncate_message(message, max_encoded):
+    """Recorta el mensaje, sin partir caracteres, para que codificado para URL no pase de max_encoded.
+
+    ValueError si no cabe ni el primer carácter junto a la marca de recorte (ver can_truncate).
+    """
+    if len(urllib.parse.quote(message)) <= max_encoded:
+        return message
+    room = max_encoded - len(urllib.parse.quote(TRUNCATION_MARK))
+    used = 0
+    for end, char in enumerate(message):
+        used += len(urllib.parse.quote(char))
+        if used > room:
+            if not end:
+                raise ValueError(f"El mensaje no cabe ni recortado en {max_encoded} caracteres codificados")
+            return message[:end] + TRUNCATION_MARK
+    return message
+
+def can_truncate(message, max_encoded):
+    """Si truncate_message puede dejar el mensaje en max_encoded sin vaciarlo"""
+    if len(urllib.parse.quote(message)) <= max_encoded:
+        return True
+    return bool(message) and len(urllib.parse.quote(message[0] + TRUNCATION_MARK)) <= max_encoded
+
+def url_length_summary(lengths, budget=URL_LENGTH_BUDGET):
+    """Distribución del largo de las URLs (percentiles) y cuántas pasan del límite"""
+    import numpy as np
+    lengths = np.asarray(lengths)
+    summary = {'contacts': int(len(lengths)), 'budget': budget, 'over': int((lengths > budget).sum())}
+    for name, share in [('min', 0), ('p50', 50), ('p95', 95), ('p99', 99), ('max', 100)]:
+        summary[name] = int(np.percentile(lengths, share, method='higher')) if len(lengths) else 0
+    return summary
+
+def template_placeholders(template):
+    """Nombres de las variables {COLUMNA} que aparecen en la plantilla"""
+    return list(dict.fromkeys(re.findall(r'\{([^{}]*)\}', template)))
+
+def compile_message_template(template, columns):
+    """Compila la plantilla una sola vez en segmentos literales y variables {COLUMNA}"""
+    columns = list(columns)
+    placeholders = {f"{{{col}}}": col for col in columns}
+    # Si algún nombre de columna tiene llaves los marcadores pueden solaparse:
+    # en ese caso se conserva el reemplazo secuencial original
+    sequential = any('{' in str(col) or '}' in str(col) for col in columns)
+    literals, slots = [], []
+    position = 0
+    if placeholders and not sequential:
+        pattern = re.compile('|'.join(re.escape(p) for p in placeholders))
+        for match in pattern.finditer(template):
+            literals.append(template[position:match.start()])
+            slots.append(placeholders[match.group()])
+            position = match.end()
+    literals.append(template[position:])
+    return {
+        'template': template,
+        'columns': columns,
+        'literals': literals,
+        'encoded_literals': [urllib.parse.quote(literal) for literal in literals],
+        'slots': slots,
+        'sequential': sequential
+    }
+
+def _render_sequential(compiled, row):
+    """Reemplazo columna por columna (comportamiento original), usado solo como respaldo"""
+    import pandas as pd
+    message = compiled['template']
+    for col in compiled['columns']:
+        value = str(row[col]) if pd.notna(row[col]) else ""
+        message = message.replace(f"{{{col}}}", value)
+    return message
+
+def _column_as_text(column):
+    """Convierte una columna a texto igual que str(valor), con "" para valores vacíos"""
+    return column.astype(object).map(str).where(column.notna(), "")
+
+def _quote_column(texts):
+    """Codifica para URL cada valor distinto de la columna una sola vez"""
+    import pandas as pd
+    encoded = {text: urllib.parse.quote(text) for text in pd.unique(texts)}
+    return texts.map(encoded)
+
+class ColumnTexts:
+    """Texto y texto codificado para URL de cada columna del DataFrame, calculados una sola vez por columna.
+
+    Se comparte entre plantillas: al cambiar la plantilla solo se calculan las
+    columnas que la versión anterior no usaba.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self._columns = {}
+
+    def _column(self, col, encoded):
+        key = (col, encoded)
+        if key not in self._columns:
+            import pandas as pd
+            if encoded:
+                texts = pd.Series(self._column(col, False)[0], dtype=object)
+                self._columns[key] = (_quote_column(texts).to_numpy(dtype=object), None)
+            else:
+                texts = _column_as_text(self.df[col])
+                self._columns[key] = (texts.to_numpy(dtype=object),
+                                      texts.str.contains('{', regex=False).to_numpy(dtype=bool))
+        return self._columns[key]
+
+    def encoded_lengths(self, col):
+        """Largo de cada valor de la columna ya codificado para URL (int64)"""
+        key = (col, 'lengths')
+        if key not in self._columns:
+            import numpy as np
+            encoded = self._column(col, True)[0]
+            self._columns[key] = (np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)), None)
+        return self._columns[key][0]
+
+    def braces(self, col):
+        """Si cada valor de la columna tiene llaves (esas filas se arman con el reemplazo secuencial)"""
+        return self._column(col, False)[1]
+
+    def take(self, col, positions, index, encoded=False):
+        """Valores de la columna en esas posiciones (Series con index) y si contienen llaves"""
+        import pandas as pd
+        values = self._column(col, encoded)[0][positions]
+        braces = self._column(col, False)[1][positions]
+        return pd.Series(values, index=index, dtype=object), pd.Series(braces, index=index)
+
+def render_message(compiled, row):
+    """Personaliza la plantilla compilada para una fila"""
+    import pandas as pd
+    values = [str(row[col]) if pd.notna(row[col]) else "" for col in compiled['slots']]
+    # Un valor con llaves podría contener el marcador de otra columna
+    if compiled['sequential'] or any('{' in value for value in values):
+        return _render_sequential(compiled, row)
+    parts = [compiled['literals'][0]]
+    for value, literal in zip(values, compiled['literals'][1:]):
+        parts += [value, literal]
+    return ''.join(parts)
+
+def render_messages(compiled, rows, encoded=False, column_texts=None):
+    """Personaliza la plantilla para todas las filas, columna por columna.
+
+    Con encoded=True devuelve el texto ya codificado para URL, reutilizando los
+    literales codificados al compilar. column_texts(col, encoded) puede dar el
+    texto de cada columna ya calculado (p. ej. de ColumnTexts), alineado con rows.
+    """
+    import pandas as pd
+    literals = compiled['encoded_literals'] if encoded else compiled['literals']
+    needs_sequential = pd.Series(compiled['sequential'], index=rows.index)
+    texts = {}
+    for col in dict.fromkeys(compiled['slots']):
+        if column_texts is not None:
+            texts[col], braces = column_texts(col, encoded)
+            needs_sequential |= braces
+            continue
+        texts[col] = _column_as_text(rows[col])
+        needs_sequential |= texts[col].str.contains('{', regex=False)
+        if encoded:
+            texts[col] = _quote_column(texts[col])
+    
+    result = pd.Series(literals[0], index=rows.index, dtype=object)
+    for col, literal in zip(compiled['slots'], literals[1:]):
+        result = result + texts[col] + literal
+    
+    if needs_sequential.any():
+        fallback = rows[needs_sequential].apply(lambda row: _render_sequential(compiled, row), axis=1)
+        if encoded:
+            fallback = fallback.map(urllib.parse.quote)
+        result[needs_sequential] = fallback
+    return result
+
+def encoded_message_lengths(compiled, rows, column_lengths=None):
+    """Largo de cada mensaje codificado para URL, sin armar los mensajes.
+
+    Suma los largos de los literales y de cada columna codificada;
+    column_lengths(col) puede dar los largos ya calculados (p. ej. de
+    ColumnTexts.encoded_lengths) y si cada valor tiene llaves, alineados con rows.
+    Las filas con llaves se arman completas, como en render_messages.
+    """
+    import numpy as np
+    lengths = np.full(len(rows), sum(map(len, compiled['encoded_literals'])), dtype=np.int64)
+    needs_sequential = np.full(len(rows), compiled['sequential'])
+    for col in compiled['slots']:
+        if column_lengths is not None:
+            col_lengths, braces = column_lengths(col)
+        else:
+            texts = _column_as_text(rows[col])
+            col_lengths = _quote_column(texts).str.len().to_numpy(dtype=np.int64)
+            braces = texts.str.contains('{', regex=False).to_numpy(dtype=bool)
+        lengths += col_lengths
+        needs_sequential |= braces
+    if needs_sequential.any():
+        fallback = render_messages(compiled, rows[needs_sequential], encoded=True)
+        lengths[needs_sequential] = fallback.str.len().to_numpy(dtype=np.int64)
+    return lengths
+
+def build_display_info(full_numbers, rows):
+    """Texto de cada contacto: número, y NOMBRE/EMPRESA si existen"""
+    display_info = full_numbers.astype(object)
+    if 'NOMBRE' in rows.columns:
+        nombre = rows['NOMBRE']
+        display_info = display_info.where(nombre.isna(), display_info + " - " + _column_as_text(nombre))
+    if 'EMPRESA' in rows.columns:
+        empresa = rows['EMPRESA']
+        display_info = display_info.where(empresa.isna(), display_info + " (" + _column_as_text(empresa) + ")")
+    return display_info
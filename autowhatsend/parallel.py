@@ -0,0 +1,87 @@
+"""Preparación en paralelo de campañas grandes con un pool de procesos.
+
+La columna de números y la campaña se dividen en bloques de chunk_rows filas;
+cada bloque se valida o se convierte en mensajes y URLs en otro proceso, y los
+resultados se unen en el orden original de las filas.
+"""
+import importlib
+import os
+from collections import deque
+from itertools import repeat
+
+from .phones import DEFAULT_COUNTRY, validate_phone_numbers
+
+PARALLEL_CHUNK_ROWS = 50000
+
+# Bloques en vuelo por proceso al exportar: limita la memoria si la escritura es más lenta
+PARALLEL_PREFETCH = 2
+
+def _import_dependencies():
+    for module in ('numpy', 'pandas'):
+        importlib.import_module(module)
+
+def create_process_pool(workers=None):
+    """Pool de procesos iniciados con spawn: es seguro crearlo desde un hilo de Streamlit.
+
+    Cada proceso importa pandas y numpy al iniciar, no en su primer bloque.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    return ProcessPoolExecutor(max_workers=workers or os.cpu_count(), mp_context=multiprocessing.get_context('spawn'),
+                               initializer=_import_dependencies)
+
+def validate_phone_numbers_parallel(numbers, default_country=DEFAULT_COUNTRY, executor=None,
+                                    chunk_rows=PARALLEL_CHUNK_ROWS, progress=None):
+    """validate_phone_numbers por bloques en el pool; conserva el orden y el índice de la columna.
+
+    Sin executor los bloques se validan en este proceso. progress(filas, total)
+    se llama después de cada bloque.
+    """
+    import pandas as pd
+    if len(numbers) <= chunk_rows:
+        validation = validate_phone_numbers(numbers, default_country)
+        if progress is not None:
+            progress(len(numbers), len(numbers))
+        return validation
+    chunks = (numbers.iloc[start:start + chunk_rows] for start in range(0, len(numbers), chunk_rows))
+    if executor is None:
+        results = (validate_phone_numbers(chunk, default_country) for chunk in chunks)
+    else:
+        results = executor.map(validate_phone_numbers, chunks, repeat(default_country))
+    parts = []
+    validated = 0
+    for part in results:
+        parts.append(part)
+        validated += len(part)
+        if progress is not None:
+            progress(validated, len(numbers))
+    return pd.concat(parts)
+
+def _run_chunk(campaign, method):
+    result = getattr(campaign, method)()
+    return list(result) if method == 'iter_records' else result
+
+def map_campaign(campaign, method, executor=None, chunk_rows=PARALLEL_CHUNK_ROWS, workers=None):
+    """Aplica un método de Campaign ('urls', 'messages', 'iter_records', ...) por bloques.
+
+    Genera el resultado de cada bloque en el orden de la campaña. Sin executor
+    se ejecuta en este proceso.
+    """
+    chunk_starts = range(0, len(campaign), chunk_rows)
+    if executor is None:
+        for start in chunk_starts:
+            yield _run_chunk(campaign.slice(start, start + chunk_rows), method)
+        return
+    window = PARALLEL_PREFETCH * (workers or os.cpu_count())
+    pending = deque()
+    for start in chunk_starts:
+        pending.append(executor.submit(_run_chunk, campaign.slice(start, start + chunk_rows), method))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+def iter_records_parallel(campaign, executor=None, chunk_rows=PARALLEL_CHUNK_ROWS, workers=None):
+    """Como Campaign.iter_records, con los bloques preparados en el pool"""
+    for records in map_campaign(campaign, 'iter_records', executor, chunk_rows, workers):
+        yield from records
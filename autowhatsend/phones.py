@@ -0,0 +1,214 @@
+"""Validación y formato de números de teléfono"""
+import re
+
+def validate_colombian_number(number):
+    """Valida que el número sea un número colombiano válido"""
+    number_str = str(number).strip()
+    clean_number = re.sub(r'[^\d]', '', number_str)
+    
+    if len(clean_number) == 10 and clean_number.startswith('3'):
+        return True, clean_number
+    return False, clean_number
+
+INVALID_NUMBER_REASON = 'Formato inválido o país no reconocido'
+
+def validate_colombian_numbers(numbers):
+    """Valida una columna completa de números colombianos (versión vectorizada de validate_colombian_number).
+
+    Para listas con números de otros países se usa validate_phone_numbers.
+    """
+    import pandas as pd
+    # NaN/None se convierten en cadena vacía: igual que str() seguido de re.sub no deja dígitos.
+    # Se fuerza dtype object para que \d siga la semántica Unicode de `re` (pyarrow solo acepta ASCII)
+    as_text = numbers.astype(str).astype(object).fillna('')
+    clean = as_text.str.replace(r'[^\d]', '', regex=True)
+    valid = (clean.str.len() == 10) & clean.str.startswith('3')
+    return pd.DataFrame({
+        'valid': valid.astype(bool),
+        'clean': clean,
+        'url_format': ('57' + clean).where(valid, ''),
+        'reason': pd.Series(INVALID_NUMBER_REASON, index=numbers.index).where(~valid, ''),
+    }, index=numbers.index)
+
+# Motivos por los que validate_phone_numbers rechaza un número
+INVALID_REASONS = {
+    'empty': 'Vacío',
+    'non_numeric': 'Contiene letras u otros caracteres',
+    'length': 'Cantidad de dígitos incorrecta',
+    'prefix': 'Prefijo o país no reconocido',
+}
+
+# Planes de numeración móvil: indicativo, largo del número nacional y prefijos
+# móviles (None acepta cualquier prefijo). El número de WhatsApp es indicativo + nacional.
+NUMBERING_PLANS = {
+    'CO': {'name': 'Colombia', 'country_code': '57', 'lengths': (10,), 'mobile_prefixes': ('3',)},
+    'AR': {'name': 'Argentina', 'country_code': '54', 'lengths': (11,), 'mobile_prefixes': ('9',)},
+    'BR': {'name': 'Brasil', 'country_code': '55', 'lengths': (11,), 'mobile_prefixes': None},
+    'CL': {'name': 'Chile', 'country_code': '56', 'lengths': (9,), 'mobile_prefixes': ('9',)},
+    'CR': {'name': 'Costa Rica', 'country_code': '506', 'lengths': (8,), 'mobile_prefixes': ('6', '7', '8')},
+    'EC': {'name': 'Ecuador', 'country_code': '593', 'lengths': (9,), 'mobile_prefixes': ('9',)},
+    'ES': {'name': 'España', 'country_code': '34', 'lengths': (9,), 'mobile_prefixes': ('6', '7')},
+    'MX': {'name': 'México', 'country_code': '52', 'lengths': (10,), 'mobile_prefixes': None},
+    'PA': {'name': 'Panamá', 'country_code': '507', 'lengths': (8,), 'mobile_prefixes': ('6',)},
+    'PE': {'name': 'Perú', 'country_code': '51', 'lengths': (9,), 'mobile_prefixes': ('9',)},
+    'US': {'name': 'Estados Unidos / Canadá', 'country_code': '1', 'lengths': (10,),
+           'mobile_prefixes': ('2', '3', '4', '5', '6', '7', '8', '9')},
+    'VE': {'name': 'Venezuela', 'country_code': '58', 'lengths': (10,), 'mobile_prefixes': ('4',)},
+}
+
+DEFAULT_COUNTRY = 'CO'
+
+# E.164 admite como máximo 15 dígitos; así todo número cabe en un int64
+MAX_PHONE_DIGITS = 15
+
+_KEY_SCALE = 10 ** MAX_PHONE_DIGITS
+
+def _prefix_table(entries):
+    """Agrupa (largo total, prefijo, país) por largo de prefijo como claves int64 ordenadas"""
+    import numpy as np
+    grouped = {}
+    for length, prefix, country in entries:
+        keys = grouped.setdefault(len(prefix), {})
+        key = length * _KEY_SCALE + int(prefix or 0)
+        if keys.get(key, country) != country:
+            raise ValueError(f"Prefijo {prefix} de {length} dígitos ambiguo entre dos países")
+        keys[key] = country
+    table = []
+    for prefix_length in sorted(grouped, reverse=True):
+        keys = dict(sorted(grouped[prefix_length].items()))
+        table.append((
+            prefix_length,
+            np.fromiter(keys, dtype=np.int64, count=len(keys)),
+            np.fromiter(keys.values(), dtype=np.int64, count=len(keys)),
+        ))
+    return table
+
+def compile_numbering_plans(plans=NUMBERING_PLANS, default_country=DEFAULT_COUNTRY):
+    """Compila los planes en tablas de búsqueda por (largo, prefijo).
+
+    La tabla internacional reconoce números con indicativo; la nacional, los
+    números sin indicativo del país por defecto. Los países se guardan como
+    posiciones en 'countries'.
+    """
+    import numpy as np
+    if default_country not in plans:
+        raise ValueError(f"País desconocido: {default_country}")
+    countries = list(plans)
+    international, national = [], []
+    lengths = set(plans[default_country]['lengths'])
+    for index, (country, plan) in enumerate(plans.items()):
+        for length in plan['lengths']:
+            for prefix in plan['mobile_prefixes'] or ('',):
+                international.append((len(plan['country_code']) + length, plan['country_code'] + prefix, index))
+                lengths.add(len(plan['country_code']) + length)
+                if country == default_country:
+                    national.append((length, prefix, index))
+    return {
+        'countries': np.array(countries + [''], dtype=object),
+        'country_codes': np.array([int(plans[c]['country_code']) for c in countries] + [0], dtype=np.int64),
+        'code_lengths': np.array([len(plans[c]['country_code']) for c in countries] + [0], dtype=np.int64),
+        'lengths': np.array(sorted(lengths), dtype=np.int64),
+        'national': _prefix_table(national),
+        'international': _prefix_table(international),
+    }
+
+_COMPILED_PLANS = {}
+
+def numbering_table(default_country=DEFAULT_COUNTRY):
+    """Tablas de NUMBERING_PLANS compiladas una sola vez por país por defecto"""
+    if default_country not in _COMPILED_PLANS:
+        _COMPILED_PLANS[default_country] = compile_numbering_plans(NUMBERING_PLANS, default_country)
+    return _COMPILED_PLANS[default_country]
+
+def _match_prefixes(table, digits, lengths, pending):
+    """Posición del país de cada número según la tabla (-1 si no coincide); solo revisa las filas pendientes"""
+    import numpy as np
+    matched = np.full(len(digits), -1, dtype=np.int64)
+    pending = pending.copy()
+    for prefix_length, keys, countries in table:
+        rows = np.flatnonzero(pending & (lengths >= prefix_length))
+        if not len(rows):
+            continue
+        lookup = lengths[rows] * _KEY_SCALE + digits[rows] // 10 ** (lengths[rows] - prefix_length)
+        found = np.searchsorted(keys, lookup).clip(max=len(keys) - 1)
+        hit = keys[found] == lookup
+        matched[rows[hit]] = countries[found[hit]]
+        pending[rows[hit]] = False
+    return matched
+
+def _invalid_reasons(numbers, as_text, lengths, table):
+    """Motivo de cada número inválido (textos de INVALID_REASONS)"""
+    import numpy as np
+    text = as_text.astype(object).str.strip()
+    empty = (numbers.isna() | (text == '')).to_numpy(dtype=bool)
+    non_numeric = text.str.contains(r'[^\d\s+\-().]', regex=True).to_numpy(dtype=bool)
+    wrong_length = ~np.isin(lengths, table['lengths'])
+    reasons = np.full(len(lengths), INVALID_REASONS['prefix'], dtype=object)
+    reasons[wrong_length] = INVALID_REASONS['length']
+    reasons[non_numeric] = INVALID_REASONS['non_numeric']
+    reasons[empty] = INVALID_REASONS['empty']
+    return reasons
+
+def validate_phone_numbers(numbers, default_country=DEFAULT_COUNTRY, table=None):
+    """Valida y normaliza a E.164 una columna de números de varios países.
+
+    Los números sin indicativo se interpretan con el plan de default_country;
+    los que empiezan con + o 00, o no coinciden con ese plan, se buscan por
+    indicativo. Devuelve valid, clean (número nacional), url_format (E.164 sin +),
+    country y reason (uno de INVALID_REASONS), alineados con el índice de entrada.
+    """
+    import numpy as np
+    import pandas as pd
+    table = table or numbering_table(default_country)
+    as_text = numbers.astype(str)
+    # + y 00 son ASCII: se buscan con cadenas de Arrow, mucho más rápidas que las de objeto
+    stripped = as_text.astype('string[pyarrow]').str.lstrip()
+    double_zero = stripped.str.startswith('00').fillna(False).to_numpy(dtype=bool)
+    international = stripped.str.startswith('+').fillna(False).to_numpy(dtype=bool) | double_zero
+    digits_text = as_text.astype(object).fillna('').str.replace(r'[^\d]', '', regex=True)
+    if double_zero.any():
+        digits_text = digits_text.where(~double_zero, digits_text.str[2:])
+
+    lengths = digits_text.str.len().to_numpy(dtype=np.int64)
+    in_range = (lengths > 0) & (lengths <= MAX_PHONE_DIGITS)
+    # int() también convierte dígitos Unicode (p. ej. árabes), que \d acepta
+    digits = np.zeros(len(lengths), dtype=np.int64)
+    digits[in_range] = digits_text[in_range].astype(np.int64).to_numpy()
+
+    # Con + o 00 se busca primero el indicativo; sin ellos, primero el plan nacional
+    national = _match_prefixes(table['national'], digits, lengths, in_range & ~international)
+    matched = _match_prefixes(table['international'], digits, lengths, in_range & (national < 0))
+    fallback = _match_prefixes(table['national'], digits, lengths, in_range & international & (matched < 0))
+    national = np.maximum(national, fallback)
+    is_national = national >= 0
+    matched[is_national] = national[is_national]
+    valid = matched >= 0
+
+    # E.164 como entero: los números nacionales reciben el indicativo delante
+    e164 = digits.copy()
+    e164[is_national] += table['country_codes'][national[is_national]] * 10 ** lengths[is_national]
+    e164_text = pd.Series(e164.astype(str), index=numbers.index, dtype=object)
+    # El número nacional es lo que sigue al indicativo en el texto E.164: conserva
+    # un 0 inicial (que el entero perdería) y siempre queda en dígitos ASCII
+    code_lengths = table['code_lengths'][matched]
+    clean = digits_text.copy()
+    for code_length in np.unique(code_lengths[valid]):
+        rows = valid & (code_lengths == code_length)
+        clean[rows] = e164_text[rows].str[int(code_length):]
+
+    reason = np.full(len(valid), '', dtype=object)
+    if not valid.all():
+        reason[~valid] = _invalid_reasons(numbers[~valid], as_text[~valid], lengths[~valid], table)
+
+    valid = pd.Series(valid, index=numbers.index)
+    return pd.DataFrame({
+        'valid': valid,
+        'clean': clean,
+        'url_format': e164_text.where(valid, ''),
+        'country': pd.Series(table['countries'][matched], index=numbers.index, dtype=object),
+        'reason': pd.Series(reason, index=numbers.index, dtype=object),
+    }, index=numbers.index)
+
+def format_number_for_url(number, country=DEFAULT_COUNTRY):
+    """Formatea el número nacional para URLs de WhatsApp"""
+    return f"{NUMBERING_PLANS[country]['country_code']}{number}"
@@ -0,0 +1,159 @@
+"""Reporte de resultados: una fila por contacto del archivo con su validación y su estado de envío.
+
+El reporte se arma y se escribe por bloques de filas: Excel con xlsxwriter en
+modo constant_memory (cada fila se escribe a disco y se descarta), CSV o
+Parquet para salidas muy grandes. Nunca hay una copia completa en memoria.
+"""
+import tempfile
+
+REPORT_FORMATS = {
+    'xlsx': {'label': 'Excel (.xlsx)', 'mime': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'},
+    'csv': {'label': 'CSV (.csv)', 'mime': 'text/csv'},
+    'parquet': {'label': 'Parquet (.parquet)', 'mime': 'application/vnd.apache.parquet'},
+}
+
+REPORT_COLUMNS = ['fila', 'numero_original', 'numero', 'pais', 'estado', 'motivo', 'envio', 'url']
+
+REPORT_CHUNK_ROWS = 10000
+
+# Excel admite 1.048.576 filas por hoja (una es el encabezado); el resto sigue en otra hoja
+XLSX_MAX_ROWS = 1048575
+
+DUPLICATE_REASON = 'Número repetido'
+
+SUPPRESSED_REASON = 'En una lista de supresión'
+
+OVERSIZED_REASON = 'URL más larga que el límite'
+
+# Estados del diario de envíos (SEND_STATES) como aparecen en el reporte
+SEND_STATE_LABELS = {
+    'queued': 'pendiente',
+    'opened': 'abierto',
+    'confirmed': 'confirmado',
+    'failed': 'fallido',
+    'skipped': 'saltado',
+}
+
+def report_statuses(validation, duplicates=None, suppressed=None, oversized=None):
+    """Estado de cada fila: válido, inválido, duplicado, suprimido o URL muy larga"""
+    import numpy as np
+    valid = validation['valid'].to_numpy()
+    statuses = np.where(valid, 'válido', 'inválido').astype(object)
+    if duplicates is not None:
+        statuses[np.asarray(duplicates, dtype=bool)] = 'duplicado'
+    if suppressed is not None:
+        statuses[np.asarray(suppressed, dtype=bool)] = 'suprimido'
+    if oversized is not None:
+        statuses[np.asarray(oversized, dtype=bool)] = 'URL muy larga'
+    return statuses
+
+def iter_report_chunks(df, number_column, validation, campaign=None, duplicates=None, suppressed=None,
+                       send_states=None, chunk_rows=REPORT_CHUNK_ROWS, oversized=None):
+    """Genera el reporte por bloques de filas del archivo original (DataFrames con REPORT_COLUMNS).
+
+    campaign aporta la URL de cada contacto enviable y send_states (p. ej.
+    SendJournal.contact_states) su estado de envío, ambos por posición en la campaña.
+    oversized marca las filas que se quitaron por tener la URL muy larga.
+    """
+    import numpy as np
+    import pandas as pd
+    statuses = report_statuses(validation, duplicates, suppressed, oversized)
+    reasons = validation['reason'].to_numpy(dtype=object).copy()
+    reasons[statuses == 'duplicado'] = DUPLICATE_REASON
+    reasons[statuses == 'suprimido'] = SUPPRESSED_REASON
+    reasons[statuses == 'URL muy larga'] = OVERSIZED_REASON
+    positions = campaign.positions if campaign is not None else np.zeros(0, dtype=np.int64)
+    states = np.full(len(positions), '', dtype=object)
+    if send_states is not None:
+        known = min(len(send_states), len(positions))
+        states[:known] = [SEND_STATE_LABELS.get(state, state) for state in send_states[:known]]
+
+    for start in range(0, len(df), chunk_rows):
+        stop = min(start + chunk_rows, len(df))
+        chunk = validation.iloc[start:stop]
+        # Las posiciones de la campaña están ordenadas: las de este bloque son un rango contiguo
+        first, last = np.searchsorted(positions, [start, stop])
+        sent = positions[first:last] - start
+        urls = np.full(stop - start, '', dtype=object)
+        send = np.full(stop - start, '', dtype=object)
+        if last > first:
+            send[sent] = states[first:last]
+            if campaign.template is not None:
+                urls[sent] = campaign.urls(first, last).to_numpy(dtype=object)
+        yield pd.DataFrame({
+            'fila': np.arange(start + 1, stop + 1, dtype=np.int64),
+            'numero_original': df[number_column].iloc[start:stop].astype(object).fillna('').astype(str).to_numpy(),
+            'numero': np.where(chunk['valid'].to_numpy(), '+' + chunk['url_format'].astype(str), '').astype(object),
+            'pais': chunk['country'].fillna('').to_numpy(dtype=object),
+            'estado': statuses[start:stop],
+            'motivo': reasons[start:stop],
+            'envio': send,
+            'url': urls,
+        }, columns=REPORT_COLUMNS)
+
+def _write_xlsx(path, chunks, sheet_name):
+    import xlsxwriter
+    # strings_to_urls=False: las URLs quedan como texto (Excel limita los hipervínculos por hoja)
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True, 'strings_to_urls': False})
+    try:
+        bold = workbook.add_format({'bold': True})
+        worksheet, row = None, XLSX_MAX_ROWS
+        for chunk in chunks:
+            columns = list(chunk.columns)
+            numeric = [dtype.kind in 'iuf' for dtype in chunk.dtypes]
+            for values in chunk.itertuples(index=False, name=None):
+                if row == XLSX_MAX_ROWS:
+                    sheets = len(workbook.worksheets())
+                    worksheet = workbook.add_worksheet(sheet_name if not sheets else f"{sheet_name} ({sheets + 1})")
+                    worksheet.write_row(0, 0, columns, bold)
+                    write_number, write_string = worksheet.write_number, worksheet.write_string
+                    row = 0
+                row += 1
+                # write() adivina el tipo de cada celda; con el tipo por columna es más rápido
+                for column, value in enumerate(values):
+                    if numeric[column]:
+                        write_number(row, column, value)
+                    elif value:
+                        write_string(row, column, value)
+        if worksheet is None:
+            workbook.add_worksheet(sheet_name)
+    finally:
+        workbook.close()
+
+def _write_csv(path, chunks):
+    # utf-8-sig para que Excel reconozca las tildes al abrir el CSV
+    with open(path, 'w', encoding='utf-8-sig', newline='') as output:
+        for index, chunk in enumerate(chunks):
+            chunk.to_csv(output, header=index == 0, index=False)
+
+def _write_parquet(path, chunks):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table.cast(writer.schema))
+    finally:
+        if writer is not None:
+            writer.close()
+
+def write_table(path, chunks, fmt='xlsx', sheet_name='Reporte'):
+    """Escribe en path una tabla que llega por bloques (DataFrames con las mismas columnas)"""
+    if fmt == 'xlsx':
+        _write_xlsx(path, chunks, sheet_name)
+    elif fmt == 'csv':
+        _write_csv(path, chunks)
+    elif fmt == 'parquet':
+        _write_parquet(path, chunks)
+    else:
+        raise ValueError(f"Formato de reporte desconocido: {fmt}")
+
+def export_report_path(chunks, fmt='xlsx', sheet_name='Reporte'):
+    """Como write_table, en un archivo temporal con nombre; devuelve su ruta"""
+    with tempfile.NamedTemporaryFile(prefix='autowhatsend_', suffix=f'.{fmt}', delete=False) as output:
+        path = output.name
+    write_table(path, chunks, fmt, sheet_name)
+    return path
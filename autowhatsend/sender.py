@@ -0,0 +1,108 @@
+"""Panel de envío automático y programador de envíos del navegador"""
+import json
+from pathlib import Path
+
+STATIC_DIR = Path(__file__).parent / 'static'
+
+def _read_static(name):
+    return (STATIC_DIR / name).read_text(encoding='utf-8')
+
+# El panel y el programador de envíos viven en static/: el HTML descargable y el
+# panel de la app los insertan en línea, y el componente de Streamlit (static/index.html)
+# los carga desde la misma carpeta.
+SEND_PANEL_CSS = _read_static('panel.css')
+SEND_SCHEDULER_JS = _read_static('scheduler.js')
+SEND_PANEL_JS = _read_static('panel.js')
+SEND_PANEL_HTML = '<div id="send-panel"></div>'
+
+PACING_MODES = {
+    'fixed': 'Delay fijo',
+    'jitter': 'Delay con variación aleatoria',
+    'token_bucket': 'Máximo de mensajes por ventana de tiempo'
+}
+
+def build_pacing(mode='fixed', delay=15, jitter=0, rate=4, window=60):
+    """Configuración del ritmo de envío que usa el programador del navegador"""
+    if mode not in PACING_MODES:
+        raise ValueError(f"Modo de ritmo desconocido: {mode}")
+    return {'mode': mode, 'delay': delay, 'jitter': jitter, 'rate': rate, 'window': window}
+
+DEFAULT_PACING = build_pacing()
+
+def seconds_per_message(pacing):
+    """Segundos promedio entre mensajes, para estimar la duración de la campaña"""
+    if pacing['mode'] == 'token_bucket':
+        return pacing['window'] / pacing['rate']
+    return pacing['delay']
+
+def describe_pacing(pacing):
+    """Texto corto del ritmo de envío para la interfaz"""
+    if pacing['mode'] == 'jitter':
+        return f"{pacing['delay']} ± {pacing['jitter']} segundos entre mensajes"
+    if pacing['mode'] == 'token_bucket':
+        return f"máximo {pacing['rate']} mensajes cada {pacing['window']} segundos"
+    return f"{pacing['delay']} segundos entre mensajes"
+
+HTML_EXPORT_BATCH = 1000
+
+# Arranque del panel en páginas autónomas: los contactos y la configuración van en línea
+SEND_PANEL_BOOT_JS = """
+const contacts = JSON.parse(document.getElementById('contacts-data').textContent);
+startSendPanel(
+    {total: contacts.length, get: function(index) { return contacts[index] || null; }},
+    JSON.parse(document.getElementById('send-config').textContent)
+);
+"""
+
+# Caracteres que se escapan como \uXXXX dentro de un <script>: <, > y & no pueden
+# cerrar la etiqueta ni abrir un comentario (<!--), y U+2028/U+2029 rompen el JS antiguo
+_SCRIPT_ESCAPES = {ord('<'): '\\u003c', ord('>'): '\\u003e', ord('&'): '\\u0026',
+                   0x2028: '\\u2028', 0x2029: '\\u2029'}
+
+def _json_for_script(value):
+    """JSON seguro dentro de <script>: el texto de la planilla no puede cambiar cómo se lee la página"""
+    return json.dumps(value, ensure_ascii=False).translate(_SCRIPT_ESCAPES)
+
+def _iter_send_page(head, contacts, config, tail):
+    """Genera por partes una página con el panel de envío.
+
+    Los contactos ([display_info, url]) van en un único bloque JSON que lee el
+    programador de envíos; contacts puede ser cualquier iterable.
+    """
+    yield head
+    yield '<script id="contacts-data" type="application/json">['
+    batch = []
+    first = True
+    for contact in contacts:
+        batch.append(_json_for_script(contact))
+        if len(batch) >= HTML_EXPORT_BATCH:
+            yield ('' if first else ',') + ','.join(batch)
+            first = False
+            batch = []
+    if batch:
+        yield ('' if first else ',') + ','.join(batch)
+    yield ']</script>\n'
+    yield '<script id="send-config" type="application/json">' + _json_for_script(config) + '</script>\n'
+    yield '<script>\n' + SEND_SCHEDULER_JS + SEND_PANEL_JS + SEND_PANEL_BOOT_JS + '</script>\n'
+    yield tail
+
+def create_javascript_opener(urls, delay=15, pacing=None, campaign_id=None, display_info=None, auto_start=True):
+    """Crea el panel de envío automático (pausa, reanudar, saltar) para insertar en la app.
+
+    Usa el mismo programador de envíos que el HTML descargable; si no se indica
+    pacing, se usa un delay fijo de `delay` segundos.
+    """
+    config = {'pacing': pacing or build_pacing(delay=delay), 'campaignId': campaign_id, 'autoStart': auto_start}
+    if display_info is None:
+        display_info = (f"Contacto {i + 1}" for i in range(len(urls)))
+    contacts = ([info, url] for info, url in zip(display_info, urls))
+    head = """
+    <style>
+        body { font-family: sans-serif; color: #262730; text-align: center; }
+        .timer { font-weight: bold; color: #25D366; }
+        .whatsapp-link { color: #128C7E; font-weight: bold; }
+        .contact-info { text-align: left; margin-top: 10px; }
+""" + SEND_PANEL_CSS + """
+    </style>
+""" + SEND_PANEL_HTML
+    return ''.join(_iter_send_page(head, contacts, config, ''))
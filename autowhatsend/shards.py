@@ -0,0 +1,128 @@
+"""Reparto de una campaña en lotes para varios operadores.
+
+Cada lote es un rango contiguo de la campaña (ningún contacto queda en dos
+lotes) con su propio HTML de envío y su lista de URLs. El manifiesto indica
+cuántos contactos tiene cada lote y cuándo se estima que termine con el ritmo
+de envío elegido. Los lotes se empaquetan en un ZIP escrito por partes.
+"""
+import csv
+import io
+import json
+import shutil
+import tempfile
+import time
+import zipfile
+
+from .export import write_html_export
+from .jobs import iter_with_progress
+from .sender import DEFAULT_PACING, seconds_per_message
+
+MANIFEST_COLUMNS = ['lote', 'operador', 'contactos', 'primer_contacto', 'ultimo_contacto',
+                    'segundos_estimados', 'fin_estimado', 'html', 'urls']
+
+def shard_sizes(total, weights):
+    """Contactos de cada lote, proporcionales a weights (restos al mayor decimal)"""
+    weights = [float(weight) for weight in weights]
+    if not weights or any(weight < 0 for weight in weights) or sum(weights) <= 0:
+        raise ValueError("Los pesos de los lotes deben ser positivos")
+    quotas = [total * weight / sum(weights) for weight in weights]
+    sizes = [int(quota) for quota in quotas]
+    by_remainder = sorted(range(len(quotas)), key=lambda index: sizes[index] - quotas[index])
+    for index in by_remainder[:total - sum(sizes)]:
+        sizes[index] += 1
+    return sizes
+
+def shard_bounds(total, weights):
+    """Rangos (inicio, fin) contiguos y sin solaparse que cubren toda la campaña"""
+    bounds = []
+    start = 0
+    for size in shard_sizes(total, weights):
+        bounds.append((start, start + size))
+        start += size
+    return bounds
+
+def parse_shard_weights(text):
+    """Convierte '2,1,1' (capacidad relativa de cada operador) en una lista de pesos"""
+    try:
+        weights = [float(part) for part in text.split(',') if part.strip()]
+    except ValueError:
+        raise ValueError(f"Pesos de lotes inválidos: {text!r}") from None
+    shard_sizes(0, weights)
+    return weights
+
+def shard_storage_id(campaign_id, index, count):
+    """Identificador de cada lote: su avance se guarda aparte en el navegador"""
+    return f"{campaign_id}-{index + 1}de{count}" if campaign_id else None
+
+def shard_manifest(bounds, pacing=None, names=None, start_at=None):
+    """Una fila por lote con sus contactos, duración y hora estimada de fin.
+
+    Todos los operadores empiezan en start_at (por defecto, ahora) con el mismo ritmo.
+    """
+    pacing = pacing or DEFAULT_PACING
+    start_at = time.time() if start_at is None else start_at
+    digits = len(str(len(bounds)))
+    manifest = []
+    for index, (start, stop) in enumerate(bounds):
+        seconds = (stop - start) * seconds_per_message(pacing)
+        name = f"lote_{index + 1:0{digits}d}"
+        manifest.append({
+            'lote': index + 1,
+            'operador': names[index] if names else f"Operador {index + 1}",
+            'contactos': stop - start,
+            'primer_contacto': start + 1 if stop > start else None,
+            'ultimo_contacto': stop if stop > start else None,
+            'segundos_estimados': seconds,
+            'fin_estimado': time.strftime('%Y-%m-%d %H:%M', time.localtime(start_at + seconds)),
+            'html': f"{name}.html",
+            'urls': f"{name}_urls.txt",
+        })
+    return manifest
+
+def _records_with_urls(records, urls_file):
+    """Deja pasar los contactos mientras guarda su URL en urls_file"""
+    for record in records:
+        urls_file.write(record['url'].encode())
+        urls_file.write(b'\n')
+        yield record
+
+def write_shard_bundle(campaign, output, weights, pacing=None, campaign_id=None, names=None, start_at=None,
+                       records=None, progress=None):
+    """Escribe en output (archivo binario) un ZIP con el HTML y las URLs de cada lote y el manifiesto.
+
+    records(subcampaña) reemplaza a iter_records() (p. ej. iter_records_parallel);
+    progress(contactos, total) informa el avance. Devuelve el manifiesto.
+    """
+    bounds = shard_bounds(len(campaign), weights)
+    manifest = shard_manifest(bounds, pacing, names, start_at)
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as bundle:
+        for index, ((start, stop), shard) in enumerate(zip(bounds, manifest)):
+            part = campaign.slice(start, stop)
+            part_records = part.iter_records() if records is None else records(part)
+            if progress is not None:
+                part_records = iter_with_progress(
+                    part_records, len(campaign), lambda done, total, offset=start: progress(offset + done, total)
+                )
+            with tempfile.SpooledTemporaryFile(max_size=2**24) as urls_file:
+                with bundle.open(shard['html'], 'w') as html_file:
+                    write_html_export(_records_with_urls(part_records, urls_file), html_file, pacing,
+                                      shard_storage_id(campaign_id, index, len(bounds)))
+                urls_file.seek(0)
+                with bundle.open(shard['urls'], 'w') as urls_member:
+                    shutil.copyfileobj(urls_file, urls_member)
+        bundle.writestr('manifest.json', json.dumps(manifest, ensure_ascii=False, indent=2))
+        table = io.StringIO()
+        writer = csv.DictWriter(table, MANIFEST_COLUMNS)
+        writer.writeheader()
+        writer.writerows(manifest)
+        # BOM para que Excel reconozca el CSV como UTF-8
+        bundle.writestr('manifest.csv', '\ufeff' + table.getvalue())
+    return manifest
+
+def export_shard_bundle_path(campaign, weights, pacing=None, campaign_id=None, names=None, records=None,
+                             progress=None):
+    """Como write_shard_bundle, en un archivo temporal con nombre; devuelve (ruta, manifiesto)"""
+    with tempfile.NamedTemporaryFile(prefix='autowhatsend_', suffix='.zip', delete=False) as output:
+        manifest = write_shard_bundle(campaign, output, weights, pacing, campaign_id, names,
+                                      records=records, progress=progress)
+    return output.name, manifest
@@ -0,0 +1,160 @@
+// Panel de envío: dibuja los controles dentro de #send-panel y los conecta con el programador.
+//
+// source: {total, get(index)} -> [display_info, url], o null si el contacto aún no está cargado.
+// config: {pacing, campaignId, autoStart, startIndex, journal}.
+// hooks: onEvent(estado, index) para 'opened', 'confirmed', 'failed' y 'skipped';
+//        onNeed(index) cuando hacen falta contactos que todavía no están en source.
+const SEND_PANEL_MARKUP = `
+    <h3>Progreso: <span id="current">0</span> / <span id="total">0</span></h3>
+    <div class="timer">Próximo envío en: <span id="timer">-</span> segundos</div>
+    <div id="status" class="status">Listo para iniciar</div>
+    <div class="send-controls">
+        <button id="btn-start" class="send-button">🚀 Iniciar Envío Automático</button>
+        <button id="btn-pause" class="send-button" style="display: none;">⏸️ Pausar</button>
+        <button id="btn-resume" class="send-button" style="display: none;">▶️ Reanudar</button>
+        <button id="btn-skip" class="send-button secondary">⏭️ Saltar contacto</button>
+        <button id="btn-reset" class="send-button secondary">🔄 Empezar de cero</button>
+    </div>
+    <div class="contact-info" id="contact" style="display: none;">
+        <strong>👤 Contacto <span id="contact-number"></span>:</strong> <span id="contact-display"></span><br>
+        <strong>💬 Mensaje:</strong> <span id="contact-message"></span>...<br><br>
+        <a id="contact-link" href="#" target="_blank" class="whatsapp-link"></a>
+        <div id="journal-controls" class="send-controls" style="display: none;">
+            <button id="btn-confirm" class="send-button">✅ Enviado</button>
+            <button id="btn-failed" class="send-button secondary">❌ No se pudo enviar</button>
+        </div>
+    </div>
+`;
+
+// Contactos por delante del actual que deben estar cargados antes de pedir más
+const SEND_PANEL_LOOKAHEAD = 20;
+
+function messagePreview(url) {
+    const text = url.slice(url.indexOf('&text=') + 6);
+    try {
+        return decodeURIComponent(text).slice(0, 100);
+    } catch (e) {
+        return '';
+    }
+}
+
+function startSendPanel(source, config, hooks) {
+    hooks = hooks || {};
+    document.getElementById('send-panel').innerHTML = SEND_PANEL_MARKUP;
+    let lastOpened = null;
+    
+    function byId(id) {
+        return document.getElementById(id);
+    }
+    
+    function show(id, visible) {
+        byId(id).style.display = visible ? 'inline-block' : 'none';
+    }
+    
+    function emit(state, index) {
+        if (hooks.onEvent) {
+            hooks.onEvent(state, index);
+        }
+    }
+    
+    // Clave por defecto derivada del contenido, para que cada campaña tenga su propio punto de control
+    function defaultStorageKey() {
+        let hash = 0;
+        const first = source.get(0);
+        const last = source.get(source.total - 1);
+        const sample = (first ? first[1] : '') + (last ? last[1] : '');
+        for (let i = 0; i < sample.length; i++) {
+            hash = (hash * 31 + sample.charCodeAt(i)) | 0;
+        }
+        return source.total + ':' + hash;
+    }
+    
+    function renderContact(index, contact) {
+        const info = contact[0];
+        const url = contact[1];
+        byId('contact-number').textContent = index + 1;
+        byId('contact-display').textContent = info;
+        byId('contact-message').textContent = messagePreview(url);
+        const link = byId('contact-link');
+        link.href = url;
+        link.textContent = '📱 Enviar a ' + info.split(' - ')[0];
+        byId('contact').style.display = 'block';
+    }
+    
+    const scheduler = createSendScheduler({
+        total: source.total,
+        pacing: config.pacing,
+        startIndex: config.startIndex,
+        storageKey: 'autowhatsend:' + (config.campaignId || defaultStorageKey()),
+        open: function(index) {
+            const contact = source.get(index);
+            if (!contact) {
+                if (hooks.onNeed) {
+                    hooks.onNeed(index);
+                }
+                return false;
+            }
+            renderContact(index, contact);
+            window.open(contact[1], '_blank');
+            lastOpened = index;
+            emit('opened', index);
+            return true;
+        },
+        onSkip: function(index) {
+            emit('skipped', index);
+        },
+        onChange: function(progress) {
+            byId('current').textContent = progress.index;
+            byId('timer').textContent = progress.seconds === null ? '-' : progress.seconds;
+            let status = 'Listo para iniciar';
+            if (progress.done) {
+                status = '✅ Envío completado';
+            } else if (progress.running) {
+                status = 'Enviando...';
+            } else if (progress.index > 0) {
+                status = '⏸️ En pausa: continúa desde el contacto ' + (progress.index + 1);
+            }
+            byId('status').textContent = status;
+            const started = progress.running || progress.index > 0;
+            show('btn-start', !started && !progress.done);
+            show('btn-pause', progress.running);
+            show('btn-resume', !progress.running && !progress.done && progress.index > 0);
+            
+            const ahead = Math.min(progress.index + SEND_PANEL_LOOKAHEAD, progress.total - 1);
+            if (hooks.onNeed && !progress.done && !source.get(ahead)) {
+                hooks.onNeed(progress.index);
+            }
+        }
+    });
+    
+    byId('total').textContent = source.total;
+    byId('btn-start').onclick = scheduler.start;
+    byId('btn-pause').onclick = scheduler.pause;
+    byId('btn-resume').onclick = scheduler.resume;
+    byId('btn-skip').onclick = scheduler.skip;
+    byId('btn-reset').onclick = scheduler.reset;
+    
+    if (config.journal) {
+        // Con diario de envíos la posición la decide el servidor: no se reinicia desde el navegador
+        show('btn-reset', false);
+        show('journal-controls', true);
+        byId('btn-confirm').onclick = function() {
+            if (lastOpened !== null) {
+                emit('confirmed', lastOpened);
+                byId('status').textContent = '✅ Contacto ' + (lastOpened + 1) + ' marcado como enviado';
+            }
+        };
+        byId('btn-failed').onclick = function() {
+            if (lastOpened !== null) {
+                emit('failed', lastOpened);
+                byId('status').textContent = '❌ Contacto ' + (lastOpened + 1) + ' marcado como fallido';
+            }
+        };
+    }
+    
+    scheduler.notify();
+    if (config.autoStart) {
+        scheduler.start();
+    }
+    return scheduler;
+}
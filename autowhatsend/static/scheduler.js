@@ -0,0 +1,169 @@
+// Programador de envíos: una sola cola recorrida por un bucle de temporizador.
+// Guarda la posición en localStorage después de cada contacto.
+//
+// options: total, pacing, storageKey, startIndex (posición inicial conocida, p. ej. del
+// diario de envíos; si falta se usa localStorage), open(index) -> false si el contacto
+// aún no está disponible, onSkip(index), onChange(progreso).
+function createSendScheduler(options) {
+    const pacing = Object.assign({mode: 'fixed', delay: 15, jitter: 0, rate: 4, window: 60}, options.pacing || {});
+    const total = options.total;
+    const state = {index: 0, running: false, done: false, nextAt: null, remaining: 0};
+    let timer = null;
+    let tokens = 1;
+    let refilledAt = Date.now();
+    
+    function save() {
+        try {
+            localStorage.setItem(options.storageKey, JSON.stringify({index: state.index, savedAt: Date.now()}));
+        } catch (e) {}
+    }
+    
+    function load() {
+        let index = 0;
+        if (typeof options.startIndex === 'number') {
+            index = options.startIndex;
+        } else {
+            try {
+                const saved = JSON.parse(localStorage.getItem(options.storageKey));
+                if (saved && saved.index > 0) {
+                    index = saved.index;
+                }
+            } catch (e) {}
+        }
+        state.index = Math.min(index, total);
+        state.done = state.index >= total;
+    }
+    
+    function refill() {
+        const now = Date.now();
+        const perSecond = pacing.rate / pacing.window;
+        tokens = Math.min(pacing.rate, tokens + (now - refilledAt) / 1000 * perSecond);
+        refilledAt = now;
+    }
+    
+    // Segundos hasta el próximo envío según el modo de ritmo
+    function nextWait() {
+        if (pacing.mode === 'jitter') {
+            return Math.max(1, pacing.delay + (Math.random() * 2 - 1) * pacing.jitter);
+        }
+        if (pacing.mode === 'token_bucket') {
+            refill();
+            return tokens >= 1 ? 0 : (1 - tokens) * pacing.window / pacing.rate;
+        }
+        return pacing.delay;
+    }
+    
+    function notify() {
+        if (options.onChange) {
+            const seconds = state.running ? Math.max(0, Math.ceil((state.nextAt - Date.now()) / 1000)) : null;
+            options.onChange({index: state.index, total: total, running: state.running, done: state.done, seconds: seconds});
+        }
+    }
+    
+    function schedule(seconds) {
+        state.nextAt = Date.now() + seconds * 1000;
+        tick();
+    }
+    
+    function finish() {
+        state.running = false;
+        state.done = true;
+        clearTimeout(timer);
+        notify();
+    }
+    
+    function sendCurrent() {
+        if (pacing.mode === 'token_bucket') {
+            refill();
+            if (tokens < 1) {
+                schedule(nextWait());
+                return;
+            }
+        }
+        if (options.open(state.index) === false) {
+            // El contacto todavía no llegó: se reintenta sin avanzar
+            schedule(1);
+            return;
+        }
+        if (pacing.mode === 'token_bucket') {
+            tokens -= 1;
+        }
+        state.index++;
+        save();
+        if (state.index >= total) {
+            finish();
+            return;
+        }
+        schedule(nextWait());
+    }
+    
+    // Se compara contra la hora de reloj: si el navegador frena la pestaña,
+    // el envío se retrasa pero el retraso no se acumula
+    function tick() {
+        clearTimeout(timer);
+        if (!state.running) {
+            return;
+        }
+        const remaining = state.nextAt - Date.now();
+        if (remaining <= 0) {
+            sendCurrent();
+            return;
+        }
+        notify();
+        timer = setTimeout(tick, Math.min(1000, remaining));
+    }
+    
+    load();
+    
+    return {
+        state: state,
+        start: function() {
+            if (state.running || state.done) {
+                return;
+            }
+            state.running = true;
+            schedule(0);
+        },
+        pause: function() {
+            if (!state.running) {
+                return;
+            }
+            state.running = false;
+            state.remaining = Math.max(0, state.nextAt - Date.now());
+            clearTimeout(timer);
+            notify();
+        },
+        resume: function() {
+            if (state.running || state.done) {
+                return;
+            }
+            state.running = true;
+            schedule(state.remaining / 1000);
+        },
+        skip: function() {
+            if (state.done) {
+                return;
+            }
+            if (options.onSkip) {
+                options.onSkip(state.index);
+            }
+            state.index++;
+            save();
+            if (state.index >= total) {
+                finish();
+                return;
+            }
+            notify();
+        },
+        reset: function() {
+            clearTimeout(timer);
+            state.index = 0;
+            state.running = false;
+            state.done = false;
+            state.remaining = 0;
+            save();
+            notify();
+        },
+        notify: notify
+    };
+}
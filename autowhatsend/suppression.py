@@ -0,0 +1,129 @@
+"""Deduplicación de números y listas de supresión entre campañas.
+
+Las listas se guardan en SQLite (por defecto en el mismo archivo que el diario de
+envíos) y se consultan en memoria como arreglos int64 ordenados: verificar una
+columna completa es una sola búsqueda binaria vectorizada (np.searchsorted).
+"""
+import sqlite3
+import threading
+import time
+
+DEDUPE_OPTIONS = {
+    'first': 'Conservar la primera fila',
+    'last': 'Conservar la última fila',
+    'none': 'Enviar a todas las filas',
+}
+
+SUPPRESSION_BATCH_SIZE = 10000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS suppressed_numbers (
+    list_name TEXT NOT NULL,
+    phone INTEGER NOT NULL,
+    reason TEXT,
+    added_at REAL NOT NULL,
+    PRIMARY KEY (list_name, phone)
+) WITHOUT ROWID;
+"""
+
+def find_duplicates(validation, keep='first'):
+    """Filas válidas cuyo número limpio ya aparece en otra fila válida.
+
+    keep='first' o 'last' indica qué fila se conserva; 'none' no marca ninguna.
+    """
+    if keep == 'none':
+        return validation['valid'] & False
+    valid = validation['valid']
+    return validation['url_format'].where(valid).duplicated(keep=keep) & valid
+
+def phones_as_int(validation):
+    """Números con indicativo como int64 (0 en las filas inválidas)"""
+    import numpy as np
+    valid = validation['valid'].to_numpy()
+    phones = np.zeros(len(validation), dtype=np.int64)
+    phones[valid] = validation['url_format'][valid].astype(np.int64).to_numpy()
+    return phones
+
+def sorted_membership(phones, sorted_phones):
+    """Para cada número, si está en sorted_phones (arreglo int64 ordenado)"""
+    import numpy as np
+    if len(sorted_phones) == 0:
+        return np.zeros(len(phones), dtype=bool)
+    positions = np.searchsorted(sorted_phones, phones).clip(max=len(sorted_phones) - 1)
+    return sorted_phones[positions] == phones
+
+class SuppressionStore:
+    """Listas de números que no deben recibir mensajes (p. ej. quienes pidieron no ser contactados).
+
+    Cada lista se carga una vez como arreglo ordenado y se vuelve a cargar solo
+    cuando cambia. Es seguro compartir una instancia entre hilos.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._arrays = {}
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.executescript(_SCHEMA)
+
+    def add(self, list_name, phones, reason=None):
+        """Agrega números (int con indicativo) a la lista; devuelve cuántos eran nuevos"""
+        phones = [int(phone) for phone in phones]
+        added = 0
+        now = time.time()
+        with self._lock, self._connection:
+            for start in range(0, len(phones), SUPPRESSION_BATCH_SIZE):
+                batch = phones[start:start + SUPPRESSION_BATCH_SIZE]
+                before = self._connection.total_changes
+                self._connection.executemany(
+                    'INSERT OR IGNORE INTO suppressed_numbers (list_name, phone, reason, added_at) VALUES (?, ?, ?, ?)',
+                    ((list_name, phone, reason, now) for phone in batch)
+                )
+                added += self._connection.total_changes - before
+            self._arrays.pop(list_name, None)
+        return added
+
+    def remove(self, list_name, phones=None):
+        """Quita números de la lista, o la lista completa si phones es None"""
+        with self._lock, self._connection:
+            if phones is None:
+                self._connection.execute('DELETE FROM suppressed_numbers WHERE list_name = ?', (list_name,))
+            else:
+                self._connection.executemany(
+                    'DELETE FROM suppressed_numbers WHERE list_name = ? AND phone = ?',
+                    ((list_name, int(phone)) for phone in phones)
+                )
+            self._arrays.pop(list_name, None)
+
+    def lists(self):
+        """Nombre de cada lista y cuántos números tiene"""
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT list_name, COUNT(*) FROM suppressed_numbers GROUP BY list_name ORDER BY list_name'
+            ).fetchall()
+        return dict(rows)
+
+    def phones(self, list_name):
+        """Números de la lista como arreglo int64 ordenado"""
+        import numpy as np
+        with self._lock:
+            if list_name not in self._arrays:
+                rows = self._connection.execute(
+                    'SELECT phone FROM suppressed_numbers WHERE list_name = ? ORDER BY phone', (list_name,)
+                ).fetchall()
+                self._arrays[list_name] = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+            return self._arrays[list_name]
+
+    def contains(self, phones, list_names):
+        """Para cada número, si aparece en alguna de las listas"""
+        import numpy as np
+        phones = np.asarray(phones, dtype=np.int64)
+        suppressed = np.zeros(len(phones), dtype=bool)
+        for list_name in list_names:
+            suppressed |= sorted_membership(phones, self.phones(list_name))
+        return suppressed
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,250 @@
+"""Benchmark de cada etapa del pipeline con libros de contactos sintéticos.
+
+Ejemplo (desde la raíz del repositorio):
+    python -m benchmarks.pipeline --rows 1000 10000 100000 --output resultados.json
+    python -m benchmarks.pipeline --rows 10000 --compare resultados.json
+    python -m benchmarks.pipeline --rows 500000 --workers 1 2 4 8 --no-memory
+
+Cada etapa se mide por separado: tiempo de pared, filas por segundo, pico de
+memoria de Python (tracemalloc, en una segunda ejecución para no distorsionar el
+tiempo) y tamaño de la salida. Los resultados se escriben en JSON. Con --workers se agregan
+las etapas validate_parallel y html_export_parallel para cada cantidad de
+procesos (el pool se crea antes de medir; la memoria de los procesos hijos no se
+cuenta).
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+from autowhatsend import (
+    PARALLEL_CHUNK_ROWS,
+    Campaign,
+    compile_message_template,
+    create_html_with_auto_click,
+    create_javascript_opener,
+    create_process_pool,
+    generate_whatsapp_urls,
+    iter_records_parallel,
+    read_contacts,
+    render_messages,
+    validate_phone_numbers,
+    validate_phone_numbers_parallel,
+)
+
+NUMBER_COLUMN = 'NUMERO'
+
+TEMPLATES = {
+    'short': "Hola {NOMBRE}, te esperamos.",
+    'medium': (
+        "Buenas tardes {NOMBRE},\n\n"
+        "Tengo disponibles dos fechas para que podamos reunirnos y realizar la difusión de la "
+        "metodología, los requisitos genéricos y los documentos. Usted puede escoger la que más "
+        "le convenga:\n\nOpción 1: Sábado 12 de abril a las 10:00 a.m., de manera virtual a través "
+        "de Zoom.\n\nOpción 2: Jueves 24 de abril a las 2:00 p.m., de manera presencial en "
+        "{CIUDAD}.\n\nQuedo atenta a la fecha que elija."
+    ),
+    'long': (
+        "Hola {NOMBRE} 👋\n\nDesde {EMPRESA} queremos invitarte a nuestro evento en {CIUDAD}. "
+        + "Habrá conferencias, talleres prácticos y espacios de networking para compartir experiencias. 🎉 " * 12
+        + "\n\nTu código de acceso es {CODIGO}. ¡Esperamos contar contigo!"
+    ),
+}
+
+NAMES = ['Ana', 'José', 'María', 'Julián', 'Sofía', 'Andrés', 'Camila', 'Óscar']
+COMPANIES = ['ABC Corp', 'XYZ Ltda', 'Café & Cía', 'Tecnología Ñ']
+CITIES = ['Bogotá', 'Medellín', 'Cali', 'Barranquilla', 'Cúcuta']
+
+def synthetic_contacts(rows, invalid_share=0.05, duplicate_share=0.05, seed=0):
+    """DataFrame de contactos con una fracción de números inválidos y duplicados"""
+    import pandas as pd
+    rng = random.Random(seed)
+    numbers = []
+    for _ in range(rows):
+        roll = rng.random()
+        if numbers and roll < duplicate_share:
+            numbers.append(rng.choice(numbers))
+        elif roll < duplicate_share + invalid_share:
+            numbers.append(rng.choice(['12345', '2' + str(rng.randrange(10**9, 10**10)), '', 'sin número']))
+        else:
+            number = str(rng.randrange(3000000000, 3999999999))
+            numbers.append(rng.choice([number, f"{number[:3]} {number[3:6]} {number[6:]}", f"+57 {number}"]))
+    return pd.DataFrame({
+        NUMBER_COLUMN: numbers,
+        'NOMBRE': [rng.choice(NAMES) for _ in range(rows)],
+        'EMPRESA': [rng.choice(COMPANIES) for _ in range(rows)],
+        'CIUDAD': [rng.choice(CITIES) for _ in range(rows)],
+        'CODIGO': [f"AW-{i:07d}" for i in range(rows)],
+    })
+
+def synthetic_workbook(directory, rows, invalid_share, duplicate_share, seed):
+    """Ruta a un .xlsx sintético; se genera una sola vez y se reutiliza"""
+    path = Path(directory) / f"contacts_{rows}_{invalid_share}_{duplicate_share}_{seed}.xlsx"
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        synthetic_contacts(rows, invalid_share, duplicate_share, seed).to_excel(path, index=False, engine='xlsxwriter')
+    return path
+
+def _output_size(value):
+    if isinstance(value, str):
+        return len(value.encode())
+    if hasattr(value, 'memory_usage'):
+        return int(value.memory_usage(deep=True).sum()) if hasattr(value, 'columns') else int(value.memory_usage(deep=True))
+    return None
+
+def pipeline_stages(path, template, executor=None, workers=None, chunk_rows=PARALLEL_CHUNK_ROWS):
+    """Etapas en orden; cada una recibe el contexto que dejaron las anteriores"""
+    import pandas as pd
+
+    def read_excel(ctx):
+        ctx['df'] = pd.read_excel(path)
+        return ctx['df']
+
+    def read_streaming(ctx):
+        with open(path, 'rb') as file_obj:
+            return read_contacts(file_obj, path.name)
+
+    def validate(ctx):
+        ctx['validation'] = validate_phone_numbers(ctx['df'][NUMBER_COLUMN])
+        ctx['campaign'] = Campaign.from_validation(ctx['df'], ctx['validation']).with_template(template)
+        return ctx['validation']
+
+    def substitute(ctx):
+        compiled = compile_message_template(template, ctx['df'].columns)
+        return render_messages(compiled, ctx['campaign'].rows())
+
+    def build_urls(ctx):
+        campaign = ctx['campaign']
+        encoded = render_messages(campaign.template, campaign.rows(), encoded=True)
+        ctx['urls'] = generate_whatsapp_urls(campaign.url_numbers(), encoded)
+        return ctx['urls']
+
+    def html_export(ctx):
+        return create_html_with_auto_click(ctx['campaign'].iter_records())
+
+    def javascript_opener(ctx):
+        return create_javascript_opener(ctx['urls'].tolist())
+
+    def validate_parallel(ctx):
+        return validate_phone_numbers_parallel(ctx['df'][NUMBER_COLUMN], executor=executor, chunk_rows=chunk_rows)
+
+    def html_export_parallel(ctx):
+        return create_html_with_auto_click(iter_records_parallel(ctx['campaign'], executor, chunk_rows, workers))
+
+    stages = [
+        ('read_excel', read_excel),
+        ('read_contacts', read_streaming),
+        ('validate', validate),
+        ('template', substitute),
+        ('urls', build_urls),
+        ('html_export', html_export),
+        ('javascript_opener', javascript_opener),
+    ]
+    if executor is not None:
+        stages += [('validate_parallel', validate_parallel), ('html_export_parallel', html_export_parallel)]
+    return stages
+
+def run_benchmark(path, rows, template_name, measure_memory=True, executor=None, workers=None,
+                  chunk_rows=PARALLEL_CHUNK_ROWS):
+    """Mide cada etapa: tiempo en una pasada y pico de memoria en otra"""
+    template = TEMPLATES[template_name]
+    results = []
+    timed_ctx, memory_ctx = {}, {}
+    stages = pipeline_stages(path, template, executor, workers, chunk_rows)
+    for (stage, run), (_, run_again) in zip(stages, pipeline_stages(path, template, executor, workers, chunk_rows)):
+        started = time.perf_counter()
+        output = run(timed_ctx)
+        seconds = time.perf_counter() - started
+
+        peak = None
+        if measure_memory:
+            tracemalloc.start()
+            run_again(memory_ctx)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        results.append({
+            'rows': rows,
+            'template': template_name,
+            'workers': workers or 1,
+            'stage': stage,
+            'seconds': round(seconds, 6),
+            'rows_per_second': round(rows / seconds, 1) if seconds else None,
+            'peak_memory_bytes': peak,
+            'output_bytes': _output_size(output),
+        })
+    return results
+
+def compare(results, baseline):
+    """Imprime la variación de tiempo y memoria frente a un JSON anterior"""
+    previous = {(r['rows'], r['template'], r.get('workers', 1), r['stage']): r for r in baseline['results']}
+    print(f"{'filas':>9} {'procesos':>8} {'etapa':<22} {'tiempo':>10} {'memoria':>10}")
+    for result in results:
+        before = previous.get((result['rows'], result['template'], result['workers'], result['stage']))
+        if not before:
+            continue
+        time_ratio = result['seconds'] / before['seconds'] if before['seconds'] else float('nan')
+        memory = ''
+        if result['peak_memory_bytes'] and before.get('peak_memory_bytes'):
+            memory = f"{result['peak_memory_bytes'] / before['peak_memory_bytes']:.2f}x"
+        print(f"{result['rows']:>9} {result['workers']:>8} {result['stage']:<22} {time_ratio:>9.2f}x {memory:>10}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del pipeline de AutoWhatSend")
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--invalid', type=float, default=0.05, help="Fracción de números inválidos")
+    parser.add_argument('--duplicates', type=float, default=0.05, help="Fracción de números duplicados")
+    parser.add_argument('--template', choices=list(TEMPLATES), nargs='+', default=['medium'])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', default='.bench_data', help="Carpeta para los libros sintéticos")
+    parser.add_argument('--no-memory', action='store_true', help="No medir el pico de memoria (más rápido)")
+    parser.add_argument('--workers', type=int, nargs='+', default=[], help="Procesos para las etapas en paralelo")
+    parser.add_argument('--chunk-rows', type=int, default=PARALLEL_CHUNK_ROWS, help="Filas por bloque en paralelo")
+    parser.add_argument('--output', help="Archivo JSON de resultados (por defecto: salida estándar)")
+    parser.add_argument('--compare', help="JSON de una ejecución anterior para comparar")
+    args = parser.parse_args(argv)
+
+    import pandas as pd
+    results = []
+    for rows in args.rows:
+        path = synthetic_workbook(args.data_dir, rows, args.invalid, args.duplicates, args.seed)
+        for template_name in args.template:
+            print(f"⏳ {rows} filas, plantilla {template_name}...", file=sys.stderr)
+            if not args.workers:
+                results += run_benchmark(path, rows, template_name, measure_memory=not args.no_memory)
+            for workers in args.workers:
+                with create_process_pool(workers) as executor:
+                    # Inicia todos los procesos antes de medir
+                    list(executor.map(abs, range(4 * workers)))
+                    results += run_benchmark(path, rows, template_name, not args.no_memory, executor, workers,
+                                             args.chunk_rows)
+
+    report = {
+        'meta': {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'invalid_share': args.invalid,
+            'duplicate_share': args.duplicates,
+            'seed': args.seed,
+            'chunk_rows': args.chunk_rows,
+        },
+        'results': results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding='utf-8')
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        compare(results, json.loads(Path(args.compare).read_text(encoding='utf-8')))
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,180 @@
+"""Prueba de carga del envío: el HTML exportado en un navegador sin ventana contra el servidor de prueba.
+
+Ejemplo (desde la raíz del repositorio):
+    pip install playwright && playwright install chromium
+    python -m benchmarks.send_flow --rows 200 --delay 0.2 --output envio.json
+    python -m benchmarks.send_flow --rows 10000 --delay 0.05 --latency 0.3 --failure-rate 0.02
+    python -m benchmarks.send_flow --rows 1000 --page opener --keep-tabs
+
+Genera una campaña sintética cuyas URLs apuntan a benchmarks/standin.py, abre
+el HTML descargable (o la página de create_javascript_opener con --page opener)
+en Chromium sin ventana y pulsa "Iniciar". Los tiempos salen de la hora de
+llegada de cada pedido al servidor: intervalo entre aperturas (p50, p95, máximo),
+deriva frente al ritmo ideal (t0 + i * delay), contactos que no llegaron o
+llegaron repetidos, y memoria de JavaScript de la página durante el envío. Las
+pestañas que se abren se cierran en cuanto cargan, salvo con --keep-tabs.
+"""
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from autowhatsend import (
+    Campaign,
+    build_pacing,
+    create_javascript_opener,
+    export_html_path,
+    validate_phone_numbers,
+)
+
+from .pipeline import NUMBER_COLUMN, TEMPLATES, synthetic_contacts
+from .standin import StandInServer
+
+def build_campaign(rows, template, send_url, seed=0):
+    """Campaña sintética (sin inválidos ni duplicados) con las URLs hacia el servidor de prueba"""
+    df = synthetic_contacts(rows, invalid_share=0, duplicate_share=0, seed=seed)
+    validation = validate_phone_numbers(df[NUMBER_COLUMN])
+    return Campaign.from_validation(df, validation).with_template(template).with_send_url(send_url)
+
+def write_page(campaign, kind, pacing, directory):
+    """Escribe la página de envío y devuelve (ruta, segundos que tomó)"""
+    started = time.perf_counter()
+    if kind == 'html':
+        path = export_html_path(campaign, pacing, campaign_id='send_flow')
+    else:
+        path = Path(directory) / 'opener.html'
+        page = create_javascript_opener(campaign.urls().tolist(), pacing=pacing, campaign_id='send_flow',
+                                        display_info=campaign.display_info().tolist(), auto_start=False)
+        path.write_text(page, encoding='utf-8')
+    return str(path), time.perf_counter() - started
+
+def _percentile(values, share):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+def summarize(requests, phones, delay):
+    """Ritmo real a partir de las llegadas al servidor, comparado con el ideal"""
+    arrivals = [entry['received_at'] for entry in requests]
+    intervals = [later - earlier for earlier, later in zip(arrivals, arrivals[1:])]
+    drift = [arrival - (arrivals[0] + index * delay) for index, arrival in enumerate(arrivals)]
+    received = [int(entry['phone']) for entry in requests if entry['phone'].isdigit()]
+    expected = set(int(phone) for phone in phones)
+    return {
+        'received': len(requests),
+        'missing': len(expected - set(received)),
+        'repeated': len(received) - len(set(received)),
+        'out_of_order': sum(1 for got, want in zip(received, phones) if got != int(want)),
+        'failures': sum(1 for entry in requests if entry['status'] != 200),
+        'interval_p50': _percentile(intervals, 0.5),
+        'interval_p95': _percentile(intervals, 0.95),
+        'interval_max': max(intervals, default=None),
+        'drift_final': drift[-1] if drift else None,
+        'drift_max': max(drift, default=None),
+        'elapsed': arrivals[-1] - arrivals[0] if arrivals else None,
+        'max_url_length': max((entry['url_length'] for entry in requests), default=None),
+    }
+
+def run_send_flow(rows, template_name='medium', page_kind='html', delay=0.2, latency=0.0, failure_rate=0.0,
+                  keep_tabs=False, timeout=None, seed=0, log_path=None, headed=False):
+    """Ejecuta una campaña completa en el navegador y devuelve el resultado medido"""
+    try:
+        from playwright.sync_api import sync_playwright
+    except ImportError:
+        raise SystemExit("❌ Falta playwright: pip install playwright && playwright install chromium")
+
+    pacing = build_pacing('fixed', delay=delay)
+    timeout = timeout if timeout is not None else rows * delay * 2 + 60
+    memory = []
+    with StandInServer(latency=latency, failure_rate=failure_rate, log_path=log_path, seed=seed) as server, \
+            tempfile.TemporaryDirectory(prefix='autowhatsend_send_flow_') as directory:
+        campaign = build_campaign(rows, TEMPLATES[template_name], server.send_url, seed)
+        path, export_seconds = write_page(campaign, page_kind, pacing, directory)
+        page_bytes = Path(path).stat().st_size
+
+        with sync_playwright() as playwright:
+            browser = playwright.chromium.launch(headless=not headed)
+            context = browser.new_context()
+            if not keep_tabs:
+                context.on('page', lambda tab: tab.on('load', lambda _: tab.close()))
+            page = context.new_page()
+            started = time.perf_counter()
+            page.goto(Path(path).as_uri())
+            page.wait_for_selector('#btn-start', state='visible')
+            load_seconds = time.perf_counter() - started
+
+            page.click('#btn-start')
+            deadline = time.monotonic() + timeout
+            while server.count() < len(campaign) and time.monotonic() < deadline:
+                memory.append(page.evaluate("performance.memory ? performance.memory.usedJSHeapSize : null"))
+                page.wait_for_timeout(1000)
+            open_tabs = len(context.pages) - 1
+            browser.close()
+        if page_kind == 'html':
+            Path(path).unlink()
+        requests = list(server.requests)
+
+    result = {
+        'rows': rows,
+        'contacts': len(campaign),
+        'template': template_name,
+        'page': page_kind,
+        'delay': delay,
+        'latency': latency,
+        'failure_rate': failure_rate,
+        'keep_tabs': keep_tabs,
+        'timed_out': len(requests) < len(campaign),
+        'export_seconds': round(export_seconds, 6),
+        'page_bytes': page_bytes,
+        'load_seconds': round(load_seconds, 6),
+        'open_tabs': open_tabs,
+        'js_heap_max_bytes': max((value for value in memory if value), default=None),
+    }
+    result.update(summarize(requests, campaign.url_numbers().tolist(), delay))
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga del envío de AutoWhatSend en un navegador sin ventana")
+    parser.add_argument('--rows', type=int, nargs='+', default=[200])
+    parser.add_argument('--template', choices=list(TEMPLATES), default='medium')
+    parser.add_argument('--page', choices=['html', 'opener'], default='html',
+                        help="HTML descargable o página de create_javascript_opener")
+    parser.add_argument('--delay', type=float, default=0.2, help="Segundos entre mensajes (ritmo fijo)")
+    parser.add_argument('--latency', type=float, default=0.0, help="Latencia simulada del servidor de prueba")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="Fracción de pedidos que responden 503")
+    parser.add_argument('--keep-tabs', action='store_true', help="No cerrar las pestañas que abre el envío")
+    parser.add_argument('--timeout', type=float, help="Segundos máximos por campaña (por defecto: 2 × duración + 60)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--log', help="Archivo JSON por líneas con cada pedido recibido")
+    parser.add_argument('--headed', action='store_true', help="Mostrar la ventana del navegador")
+    parser.add_argument('--output', help="Archivo JSON de resultados (por defecto: salida estándar)")
+    args = parser.parse_args(argv)
+
+    results = []
+    for rows in args.rows:
+        print(f"⏳ {rows} contactos cada {args.delay} s ({args.page})...", file=sys.stderr)
+        results.append(run_send_flow(rows, args.template, args.page, args.delay, args.latency, args.failure_rate,
+                                     args.keep_tabs, args.timeout, args.seed, args.log, args.headed))
+
+    report = {
+        'meta': {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+        },
+        'results': results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding='utf-8')
+    else:
+        print(json.dumps(report, indent=2))
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,147 @@
+"""Servidor local que reemplaza a WhatsApp Web para pruebas de carga del envío.
+
+Ejemplo (desde la raíz del repositorio):
+    python -m benchmarks.standin --port 8765 --latency 0.3 --failure-rate 0.05 --log standin.jsonl
+    AUTOWHATSEND_SEND_URL=http://127.0.0.1:8765/send streamlit run app.py
+
+Responde a /send?phone=&text= con una página mínima, después de una latencia
+simulada (--latency ± --latency-jitter segundos) y con una fracción de errores
+503 (--failure-rate). Cada pedido queda registrado con su hora de llegada, en
+memoria y, con --log, como una línea JSON. No envía nada a ningún lado.
+"""
+import argparse
+import html
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+class StandInServer:
+    """Servidor de prueba en un hilo propio; requests guarda cada pedido a /send en orden de llegada"""
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, latency_jitter=0.0, failure_rate=0.0,
+                 log_path=None, seed=None):
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.failure_rate = failure_rate
+        self.log_path = log_path
+        self.requests = []
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def send_url(self):
+        """Dirección para AUTOWHATSEND_SEND_URL o --send-url"""
+        return f"{self.url}/send"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server._handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def _handle(self, request):
+        received_at = time.time()
+        parts = urlsplit(request.path)
+        if parts.path.rstrip('/') != '/send':
+            self._respond(request, 404, "No encontrado")
+            return
+        query = parse_qs(parts.query)
+        phone = query.get('phone', [''])[0]
+        text = query.get('text', [''])[0]
+        with self._lock:
+            delay = max(0.0, self.latency + self._random.uniform(-1, 1) * self.latency_jitter)
+            failed = self._random.random() < self.failure_rate
+        time.sleep(delay)
+        status = 503 if failed else 200
+        entry = {
+            'received_at': received_at,
+            'phone': phone,
+            'text_length': len(text),
+            'url_length': len(request.path),
+            'status': status,
+            'latency': round(delay, 6),
+        }
+        with self._lock:
+            entry['sequence'] = len(self.requests)
+            self.requests.append(entry)
+            if self.log_path:
+                with open(self.log_path, 'a', encoding='utf-8') as log:
+                    log.write(json.dumps(entry) + '\n')
+        if failed:
+            self._respond(request, status, "Servicio no disponible (falla simulada)")
+        else:
+            self._respond(request, status, f"Chat con +{html.escape(phone)}: {html.escape(text[:200])}")
+
+    def _respond(self, request, status, message):
+        body = f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{message}</title></head>" \
+               f"<body><p id='standin'>{message}</p></body></html>".encode()
+        request.send_response(status)
+        request.send_header('Content-Type', 'text/html; charset=utf-8')
+        request.send_header('Content-Length', str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='autowhatsend-standin', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def count(self):
+        with self._lock:
+            return len(self.requests)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor local que simula WhatsApp Web para pruebas de carga")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help="Segundos de espera antes de responder")
+    parser.add_argument('--latency-jitter', type=float, default=0.0, help="Variación aleatoria (± segundos)")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="Fracción de pedidos que responden 503")
+    parser.add_argument('--log', help="Archivo JSON por líneas con cada pedido")
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args(argv)
+
+    server = StandInServer(args.host, args.port, args.latency, args.latency_jitter, args.failure_rate,
+                           args.log, args.seed)
+    print(f"🧪 Servidor de prueba en {server.send_url} (Ctrl+C para terminar)", file=sys.stderr)
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+    print(f"📨 {server.count()} pedidos recibidos", file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())